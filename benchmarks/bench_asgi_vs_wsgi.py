@@ -0,0 +1,170 @@
+"""
+Compare the WSGI deployment (gunicorn sync workers, core.wsgi) with the ASGI
+one (gunicorn + uvicorn workers, core.asgi and the async views) under many
+concurrent clients polling the hot read endpoints.
+
+    python benchmarks/bench_asgi_vs_wsgi.py [concurrency] [seconds] [workers]
+
+Both servers run as subprocesses against the benchmark's test database, so
+it has to be one they can connect to (PostgreSQL, or SQLite with a file
+TEST NAME). The response cache is turned off in the servers, so every
+request reaches the database.
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import aiohttp
+from common import BASE_DIR, report, setup_django, test_database
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+
+from api.models import Category, Task  # noqa: E402
+
+PATHS = ["/api/tasks/?page_size=20", "/api/telegram/user/1/tasks/?page_size=20"]
+
+SERVERS = {
+    "wsgi (sync workers)": ["src.core.wsgi:application"],
+    "asgi (uvicorn workers)": [
+        "-c",
+        "src/core/gunicorn_asgi.py",
+        "src.core.asgi:application",
+    ],
+}
+
+
+def seed(count):
+    user = User.objects.create_user(username="bench", password="bench")
+    categories = [Category.objects.create(name=f"Bench {i}") for i in range(3)]
+    tasks = Task.objects.bulk_create(
+        Task(title=f"Task {i}", description="Benchmark", user=user)
+        for i in range(count)
+    )
+    Task.categories.through.objects.bulk_create(
+        Task.categories.through(task_id=task.id, category_id=category.id)
+        for task in tasks
+        for category in categories
+    )
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, port, workers, database):
+    env = {
+        **os.environ,
+        "DB_NAME": database,
+        "API_RESPONSE_CACHE_TIMEOUT": "0",
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [str(BASE_DIR / "src"), os.environ.get("PYTHONPATH")])
+        ),
+    }
+    env.pop("API_ASYNC_VIEWS", None)
+    command = [
+        sys.executable,
+        "-m",
+        "gunicorn",
+        *args[:-1],
+        "--bind",
+        f"127.0.0.1:{port}",
+        "--workers",
+        str(workers),
+        "--log-level",
+        "warning",
+        args[-1],
+    ]
+    return subprocess.Popen(command, cwd=BASE_DIR, env=env)
+
+
+async def wait_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(base_url + PATHS[0]) as resp:
+                    if resp.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f"{base_url} did not come up")
+
+
+async def load(base_url, concurrency, seconds):
+    """Latencies of the requests answered with 200, and the error count"""
+    latencies = []
+    errors = 0
+    deadline = time.monotonic() + seconds
+    connector = aiohttp.TCPConnector(limit=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector) as session:
+
+        async def client(n):
+            nonlocal errors
+            i = n
+            while time.monotonic() < deadline:
+                url = base_url + PATHS[i % len(PATHS)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    async with session.get(url) as resp:
+                        await resp.read()
+                        ok = resp.status == 200
+                except aiohttp.ClientError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        await asyncio.gather(*(client(n) for n in range(concurrency)))
+    return latencies, errors
+
+
+def bench(args, concurrency, seconds, workers, database):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = start_server(args, port, workers, database)
+    try:
+        asyncio.run(wait_ready(base_url))
+        # Warm up connections, workers and database caches
+        asyncio.run(load(base_url, concurrency, 1))
+        latencies, errors = asyncio.run(load(base_url, concurrency, seconds))
+    finally:
+        server.terminate()
+        server.wait()
+    quantiles = statistics.quantiles(latencies, n=100)
+    p50, p99 = quantiles[49], quantiles[98]
+    return [
+        ("requests/sec", f"{len(latencies) / seconds:.0f}"),
+        ("p50 latency", f"{p50 * 1000:.1f} ms"),
+        ("p99 latency", f"{p99 * 1000:.1f} ms"),
+        ("errors", errors),
+    ]
+
+
+def main():
+    concurrency = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+
+    with test_database() as connection:
+        seed(200)
+        database = connection.settings_dict["NAME"]
+        for name, args in SERVERS.items():
+            rows = bench(args, concurrency, seconds, workers, database)
+            report(f"{name}: {concurrency} clients, {workers} workers", rows)
+
+
+if __name__ == "__main__":
+    main()
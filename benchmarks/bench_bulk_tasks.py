@@ -0,0 +1,75 @@
+"""
+Compare creating, completing and deleting tasks one request at a time with a
+single /api/tasks/bulk/ request.
+
+    python benchmarks/bench_bulk_tasks.py [count]
+"""
+
+import sys
+
+from common import report, setup_django, test_database, timer
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.test import Client  # noqa: E402
+
+from api.models import Category, Task  # noqa: E402
+
+
+def run(count):
+    client = Client()
+    user = User.objects.create_superuser(username="bench", password="bench")
+    client.force_login(user)
+    categories = [Category.objects.create(name=f"Bench {i}").id for i in range(3)]
+    items = [
+        {"title": f"Task {i}", "description": "Benchmark", "category_ids": categories}
+        for i in range(count)
+    ]
+    results = {}
+
+    with timer(results, "single: create"):
+        for item in items:
+            client.post("/api/tasks/", item, content_type="application/json")
+    ids = list(Task.objects.values_list("id", flat=True))
+    with timer(results, "single: complete"):
+        for task_id in ids:
+            client.patch(
+                f"/api/tasks/{task_id}/",
+                {"completed": True},
+                content_type="application/json",
+            )
+    with timer(results, "single: delete"):
+        for task_id in ids:
+            client.delete(f"/api/tasks/{task_id}/")
+    Task.objects.all().delete()
+
+    with timer(results, "bulk: create"):
+        client.post(
+            "/api/tasks/bulk/", {"create": items}, content_type="application/json"
+        )
+    ids = list(Task.objects.values_list("id", flat=True))
+    with timer(results, "bulk: complete"):
+        client.post(
+            "/api/tasks/bulk/",
+            {"update": [{"id": task_id, "completed": True} for task_id in ids]},
+            content_type="application/json",
+        )
+    with timer(results, "bulk: delete"):
+        client.post(
+            "/api/tasks/bulk/", {"delete": ids}, content_type="application/json"
+        )
+
+    rows = []
+    for operation in ("create", "complete", "delete"):
+        single = results[f"single: {operation}"]
+        bulk = results[f"bulk: {operation}"]
+        rows.append((f"{operation} single", f"{single:.3f}s ({count / single:,.0f}/s)"))
+        rows.append((f"{operation} bulk", f"{bulk:.3f}s ({count / bulk:,.0f}/s)"))
+        rows.append((f"{operation} speedup", f"{single / bulk:.1f}x"))
+    report(f"Bulk vs single-item task writes, {count} tasks", rows)
+
+
+if __name__ == "__main__":
+    with test_database():
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
@@ -0,0 +1,143 @@
+"""
+Compare database connection handling under a burst of concurrent requests:
+a new connection per request, persistent connections with health checks and
+the psycopg pool (PostgreSQL only).
+
+    python benchmarks/bench_db_connections.py [threads] [requests]
+
+Each mode runs in a subprocess configured through the same environment
+variables as a deployment (DB_CONN_MAX_AGE, DB_POOL, PROCESS_TYPE). Its
+threads play the request handlers of one web worker: they send the request
+started/finished signals Django sends around every request and fetch a page
+of tasks in between. Reported are the connects Django made, the peak number
+of server connections (PostgreSQL only) and the request latency.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from common import BASE_DIR, report, setup_django, test_database
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.signals import request_finished, request_started  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+
+from api.models import Task  # noqa: E402
+
+MODES = {
+    "new connection per request": {"DB_CONN_MAX_AGE": "0", "DB_POOL": "0"},
+    "persistent + health checks": {"DB_CONN_MAX_AGE": "60", "DB_POOL": "0"},
+    "psycopg pool": {"DB_POOL": "1", "PROCESS_TYPE": "web"},
+}
+
+
+def server_connections():
+    """Connections of the server to this database, or None if unknown"""
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database()"
+        )
+        # Without the monitor's own connection
+        return cursor.fetchone()[0] - 1
+
+
+def handle_request():
+    request_started.send(sender=None)
+    try:
+        list(Task.objects.with_related()[:20])
+    finally:
+        request_finished.send(sender=None)
+
+
+def run_mode(threads, requests):
+    connects = []
+    latencies = []
+    peak = None
+    done = threading.Event()
+    connection_created.connect(lambda **kwargs: connects.append(1), weak=False)
+
+    def handler():
+        for _ in range(requests):
+            start = time.perf_counter()
+            handle_request()
+            latencies.append(time.perf_counter() - start)
+        connections.close_all()
+
+    def monitor():
+        nonlocal peak
+        while not done.is_set():
+            count = server_connections()
+            if count is not None:
+                peak = max(peak or 0, count)
+            time.sleep(0.05)
+        connections.close_all()
+
+    monitor_thread = threading.Thread(target=monitor)
+    monitor_thread.start()
+    handlers = [threading.Thread(target=handler) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in handlers:
+        thread.start()
+    for thread in handlers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    monitor_thread.join()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests/sec": f"{len(latencies) / elapsed:.0f}",
+        "p50 latency": f"{quantiles[49] * 1000:.2f} ms",
+        "p99 latency": f"{quantiles[98] * 1000:.2f} ms",
+        # The monitor thread's connects are not requests
+        "connects": len(connects) - int(peak is not None),
+        "server connections (peak)": "n/a" if peak is None else peak,
+    }
+
+
+def spawn(mode_env, threads, requests, database):
+    env = {**os.environ, **mode_env, "DB_NAME": database}
+    output = subprocess.run(
+        [sys.executable, __file__, "--mode", str(threads), str(requests)],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--mode"]
+    threads = int(args[0]) if args else 16
+    requests = int(args[1]) if len(args) > 1 else 200
+
+    if "--mode" in sys.argv:
+        print(json.dumps(run_mode(threads, requests)))
+        return
+
+    with test_database() as conn:
+        user = User.objects.create_user(username="bench", password="bench")
+        Task.objects.bulk_create(Task(title=f"Task {i}", user=user) for i in range(100))
+        database = conn.settings_dict["NAME"]
+        for name, mode_env in MODES.items():
+            if mode_env.get("DB_POOL") == "1" and conn.vendor != "postgresql":
+                print(f"{name}: skipped, needs PostgreSQL")
+                continue
+            results = spawn(mode_env, threads, requests, database)
+            report(f"{name}: {threads} threads x {requests} requests", results.items())
+
+
+if __name__ == "__main__":
+    main()
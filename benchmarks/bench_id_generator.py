@@ -0,0 +1,56 @@
+"""
+Throughput of core.id_generator and uniqueness of IDs generated concurrently
+by several processes (each one is a separate ID worker, like gunicorn workers).
+
+    python benchmarks/bench_id_generator.py [ids_per_process] [processes]
+"""
+
+import multiprocessing
+import sys
+import time
+
+from common import report, setup_django
+
+setup_django()
+
+from core.id_generator import generate_task_id, generate_task_ids  # noqa: E402
+
+
+def generate(count):
+    return [generate_task_id() for _ in range(count)]
+
+
+def run(count, processes):
+    rows = []
+
+    start = time.perf_counter()
+    single = generate(count)
+    elapsed = time.perf_counter() - start
+    rows.append(("one at a time", f"{count / elapsed:,.0f} ids/s"))
+    rows.append(("monotonic", single == sorted(single)))
+
+    start = time.perf_counter()
+    reserved = generate_task_ids(count)
+    elapsed = time.perf_counter() - start
+    rows.append((f"reserve({count})", f"{count / elapsed:,.0f} ids/s"))
+    rows.append(("reserved after single", reserved[0] > single[-1]))
+
+    context = multiprocessing.get_context("fork")
+    start = time.perf_counter()
+    with context.Pool(processes) as pool:
+        batches = pool.map(generate, [count] * processes)
+    elapsed = time.perf_counter() - start
+    total = sum(len(batch) for batch in batches)
+    everything = [task_id for batch in batches for task_id in batch]
+    everything += single + reserved
+    rows.append((f"{processes} processes", f"{total / elapsed:,.0f} ids/s"))
+    rows.append(("unique across processes", len(set(everything)) == len(everything)))
+
+    report(f"ID generator, {count} ids per process", rows)
+
+
+if __name__ == "__main__":
+    run(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+    )
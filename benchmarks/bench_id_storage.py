@@ -0,0 +1,145 @@
+"""
+Index size and join speed of CustomIDField stored as varchar(50) (prefixed
+strings) versus bigint, on a task table plus an M2M link table.
+
+    python benchmarks/bench_id_storage.py [rows]
+
+Use PostgreSQL settings for representative numbers; on SQLite the sizes come
+from the dbstat virtual table.
+"""
+
+import sys
+import time
+
+from common import report, setup_django, test_database
+
+setup_django()
+
+from core.id_generator import format_id  # noqa: E402
+
+LINKS_PER_TASK = 2
+
+
+def create_tables(cursor, name, id_type):
+    cursor.execute(
+        f"CREATE TABLE bench_{name}_task (id {id_type} NOT NULL PRIMARY KEY, "
+        "title varchar(200) NOT NULL)"
+    )
+    cursor.execute(
+        f"CREATE TABLE bench_{name}_link (task_id {id_type} NOT NULL "
+        f"REFERENCES bench_{name}_task (id), category_id {id_type} NOT NULL, "
+        "PRIMARY KEY (task_id, category_id))"
+    )
+    cursor.execute(
+        f"CREATE INDEX bench_{name}_link_category ON bench_{name}_link (category_id)"
+    )
+
+
+def populate(connection, cursor, rows):
+    if connection.vendor == "postgresql":
+        for name, task, category in (
+            (
+                "char",
+                "'TASK_' || lpad(upper(to_hex(g)), 16, '0')",
+                "'CAT_' || lpad(upper(to_hex(({g}) % 50)), 16, '0')",
+            ),
+            ("bigint", "g", "({g}) % 50"),
+        ):
+            cursor.execute(
+                f"INSERT INTO bench_{name}_task SELECT {task}, 'Task' "
+                f"FROM generate_series(1, {rows}) g"
+            )
+            for offset in range(LINKS_PER_TASK):
+                linked = category.format(g=f"g + {offset}")
+                cursor.execute(
+                    f"INSERT INTO bench_{name}_link SELECT {task}, {linked} "
+                    f"FROM generate_series(1, {rows}) g"
+                )
+        return
+
+    for name, task, category in (
+        ("char", lambda g: format_id("TASK_", g), lambda g: format_id("CAT_", g % 50)),
+        ("bigint", lambda g: g, lambda g: g % 50),
+    ):
+        cursor.executemany(
+            f"INSERT INTO bench_{name}_task VALUES (%s, 'Task')",
+            [(task(g),) for g in range(1, rows + 1)],
+        )
+        cursor.executemany(
+            f"INSERT INTO bench_{name}_link VALUES (%s, %s)",
+            [
+                (task(g), category(g + offset))
+                for g in range(1, rows + 1)
+                for offset in range(LINKS_PER_TASK)
+            ],
+        )
+
+
+def index_size(connection, cursor, name):
+    if connection.vendor == "postgresql":
+        cursor.execute(
+            "SELECT pg_indexes_size(%s) + pg_indexes_size(%s)",
+            [f"bench_{name}_task", f"bench_{name}_link"],
+        )
+    else:
+        cursor.execute(
+            "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name IN (%s, %s))",
+            [f"bench_{name}_task", f"bench_{name}_link"],
+        )
+    return cursor.fetchone()[0]
+
+
+def time_query(cursor, sql, params=(), repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(rows):
+    from django.db import connection
+
+    results = {}
+    with connection.cursor() as cursor:
+        for name, id_type in (("char", "varchar(50)"), ("bigint", "bigint")):
+            create_tables(cursor, name, id_type)
+        populate(connection, cursor, rows)
+        if connection.vendor == "postgresql":
+            cursor.execute("ANALYZE")
+
+        for name in ("char", "bigint"):
+            probe = format_id("CAT_", 7) if name == "char" else 7
+            results[name] = {
+                "index bytes": index_size(connection, cursor, name),
+                "join all": time_query(
+                    cursor,
+                    f"SELECT COUNT(*) FROM bench_{name}_link l "
+                    f"JOIN bench_{name}_task t ON t.id = l.task_id",
+                ),
+                "join one category": time_query(
+                    cursor,
+                    f"SELECT t.id FROM bench_{name}_link l "
+                    f"JOIN bench_{name}_task t ON t.id = l.task_id "
+                    "WHERE l.category_id = %s",
+                    [probe],
+                ),
+            }
+
+    rows_out = []
+    for metric in ("index bytes", "join all", "join one category"):
+        char, bigint = results["char"][metric], results["bigint"][metric]
+        unit = "" if metric == "index bytes" else "s"
+        fmt = "{:,.0f}" if metric == "index bytes" else "{:.4f}"
+        rows_out.append((f"{metric} varchar", fmt.format(char) + unit))
+        rows_out.append((f"{metric} bigint", fmt.format(bigint) + unit))
+        rows_out.append((f"{metric} ratio", f"{char / bigint:.2f}x"))
+    report(f"CustomIDField storage, {rows:,} tasks, {connection.vendor}", rows_out)
+
+
+if __name__ == "__main__":
+    with test_database():
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,73 @@
+"""
+Import throughput of TaskImporter (COPY on PostgreSQL, bulk_create
+elsewhere) versus creating the same tasks one TaskSerializer.save() at a
+time.
+
+    python benchmarks/bench_import.py [rows] [batch_size]
+"""
+
+import json
+import sys
+
+from common import report, setup_django, test_database, timer
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+
+from api.importer import TaskImporter, read_rows  # noqa: E402
+from api.models import Category, Task  # noqa: E402
+from api.serializers import TaskSerializer  # noqa: E402
+
+
+def run(rows, batch_size):
+    user = User.objects.create_user(username="bench", password="bench")
+    categories = [Category.objects.create(name=f"Bench {i}").id for i in range(3)]
+    lines = [
+        json.dumps(
+            {
+                "title": f"Task {i}",
+                "description": "Benchmark",
+                "completed": i % 3 == 0,
+                "category_ids": categories[: i % 4],
+            }
+        ).encode()
+        + b"\n"
+        for i in range(rows)
+    ]
+    results = {}
+
+    with timer(results, "serializer"):
+        with transaction.atomic():
+            for _, row, _ in read_rows(lines):
+                serializer = TaskSerializer(data=row)
+                serializer.is_valid(raise_exception=True)
+                serializer.save(user=user)
+    assert Task.objects.count() == rows
+    Task.objects.all().delete()
+
+    with timer(results, "importer"):
+        summary = TaskImporter(user, batch_size=batch_size).run(read_rows(lines))
+    assert summary["imported"] == rows
+
+    serializer, importer = results["serializer"], results["importer"]
+    report(
+        f"Task import, {rows:,} rows, batch {batch_size}, {connection.vendor}",
+        [
+            (
+                "per-row serializer",
+                f"{serializer:.3f}s ({rows / serializer:,.0f} rows/s)",
+            ),
+            ("importer", f"{importer:.3f}s ({rows / importer:,.0f} rows/s)"),
+            ("speedup", f"{serializer / importer:.1f}x"),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    with test_database():
+        run(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 20_000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else TaskImporter.batch_size,
+        )
@@ -0,0 +1,114 @@
+"""
+Encode time and bytes on the wire of task list pages: DRF's stdlib
+JSONRenderer versus the orjson renderer, and the size and compression time
+of each encoding of core.compression.
+
+    python benchmarks/bench_json_compression.py [sizes]
+
+``sizes`` is a comma-separated list of page sizes (default 50,500,5000).
+"""
+
+import sys
+import time
+
+from common import report, setup_django, test_database
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.fast_serializers import serialize_task_rows, task_values  # noqa: E402
+from api.models import Category, Task  # noqa: E402
+from api.renderers import ORJSONRenderer, orjson_enabled  # noqa: E402
+from core.compression import COMPRESSORS, compress  # noqa: E402
+
+
+def populate(count):
+    user = User.objects.create_user(username="bench", password="bench")
+    categories = [
+        Category.objects.create(name=f"Bench {i}", description="Benchmark")
+        for i in range(5)
+    ]
+    now = timezone.now()
+    Task.objects.bulk_create(
+        Task(
+            id=f"TASK_{i + 1:016X}",
+            title=f"Task {i}",
+            description=f"Benchmark task number {i}",
+            completed=i % 3 == 0,
+            due_date=now if i % 2 else None,
+            user=user,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    )
+    Through = Task.categories.through
+    Through.objects.bulk_create(
+        Through(task_id=f"TASK_{i + 1:016X}", category_id=categories[j].id)
+        for i in range(count)
+        for j in range(i % 3)
+    )
+    return Task.objects.for_user(user)
+
+
+def best_time(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = func()
+        best = min(best, time.perf_counter() - start)
+    return value, best
+
+
+def run(sizes):
+    queryset = populate(max(sizes))
+    for size in sizes:
+        data = {
+            "next": None,
+            "previous": None,
+            "results": serialize_task_rows(task_values(queryset[:size])),
+        }
+        body, stdlib = best_time(lambda: JSONRenderer().render(data))
+        fast, orjson_time = best_time(lambda: ORJSONRenderer().render(data))
+        assert fast == body
+
+        rows = [
+            ("encode json", f"{stdlib * 1000:.2f}ms"),
+            (
+                (
+                    "encode orjson"
+                    if orjson_enabled()
+                    else "encode orjson (not installed)"
+                ),
+                f"{orjson_time * 1000:.2f}ms ({stdlib / orjson_time:.1f}x)",
+            ),
+            ("identity", f"{len(body):,} bytes"),
+        ]
+        for encoding in ("gzip", "br", "zstd"):
+            if encoding not in COMPRESSORS:
+                rows.append((encoding, "not installed"))
+                continue
+            compressed, seconds = best_time(lambda: compress(encoding, body))
+            rows.append(
+                (
+                    encoding,
+                    f"{len(compressed):,} bytes ({len(body) / len(compressed):.1f}x), "
+                    f"{seconds * 1000:.2f}ms",
+                )
+            )
+        report(f"Task list page of {size:,} tasks", rows)
+
+
+if __name__ == "__main__":
+    with test_database():
+        run(
+            [
+                int(size)
+                for size in (sys.argv[1] if len(sys.argv) > 1 else "50,500,5000").split(
+                    ","
+                )
+            ]
+        )
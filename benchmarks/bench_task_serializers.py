@@ -0,0 +1,110 @@
+"""
+Serialization throughput of task list payloads: TaskSerializer over model
+instances versus the .values() fast path of api.fast_serializers, rendered
+with DRF's JSONRenderer (and orjson, if installed).
+
+    python benchmarks/bench_task_serializers.py [tasks]
+"""
+
+import sys
+
+from common import report, setup_django, test_database, timer
+
+setup_django()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api.fast_serializers import serialize_task_rows, task_values  # noqa: E402
+from api.models import Category, Task  # noqa: E402
+from api.serializers import TaskSerializer  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+REPEAT = 3
+
+
+def populate(count):
+    user = User.objects.create_user(username="bench", password="bench")
+    categories = [
+        Category.objects.create(name=f"Bench {i}", description="Benchmark")
+        for i in range(5)
+    ]
+    now = timezone.now()
+    Task.objects.bulk_create(
+        Task(
+            id=f"TASK_{i + 1:016X}",
+            title=f"Task {i}",
+            description="Benchmark task " * 5,
+            completed=i % 3 == 0,
+            due_date=now if i % 2 else None,
+            user=user,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    )
+    Through = Task.categories.through
+    Through.objects.bulk_create(
+        Through(task_id=f"TASK_{i + 1:016X}", category_id=categories[j].id)
+        for i in range(count)
+        for j in range(i % 3)
+    )
+    return Task.objects.for_user(user).with_related()
+
+
+def best(results, name, func):
+    """Best of REPEAT runs of ``func``, stored in results[name]"""
+    times = []
+    for _ in range(REPEAT):
+        with timer(results, name):
+            value = func()
+        times.append(results[name])
+    results[name] = min(times)
+    return value
+
+
+def run(count):
+    queryset = populate(count)
+    renderer = JSONRenderer()
+    results = {}
+
+    tasks = list(queryset)
+    rows = list(task_values(queryset))
+    # The fast path runs its category query here; the tasks were prefetched
+    slow = best(results, "serializer", lambda: TaskSerializer(tasks, many=True).data)
+    fast = best(results, "fast", lambda: serialize_task_rows(rows))
+    body = renderer.render(slow)
+    assert renderer.render(fast) == body
+
+    best(
+        results,
+        "serializer + query",
+        lambda: TaskSerializer(list(queryset.all()), many=True).data,
+    )
+    best(results, "fast + query", lambda: serialize_task_rows(task_values(queryset)))
+    best(results, "render json", lambda: renderer.render(fast))
+    if orjson is not None:
+        assert orjson.dumps(fast) == body
+        best(results, "render orjson", lambda: orjson.dumps(fast))
+
+    out = []
+    for name, seconds in results.items():
+        out.append((name, f"{seconds:.3f}s ({count / seconds:,.0f} tasks/s)"))
+    out.append(("serialize speedup", f"{results['serializer'] / results['fast']:.1f}x"))
+    out.append(
+        (
+            "end to end speedup",
+            f"{results['serializer + query'] / results['fast + query']:.1f}x",
+        )
+    )
+    report(f"Task list serialization, {count:,} tasks, {len(body):,} bytes", out)
+
+
+if __name__ == "__main__":
+    with test_database():
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -0,0 +1,58 @@
+"""
+Shared helpers for the benchmark scripts in this directory.
+
+Benchmarks run against a throwaway test database created from the configured
+DJANGO_SETTINGS_MODULE (core.settings by default), e.g.:
+
+    python benchmarks/bench_bulk_tasks.py
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / "src"))
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextlib.contextmanager
+def test_database():
+    """Create a fresh test database for the duration of the block"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+@contextlib.contextmanager
+def timer(results, name):
+    """Store the wall-clock duration of the block in results[name]"""
+    start = time.perf_counter()
+    # Keep stray prints (e.g. from serializers) out of the measurement output
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+    results[name] = time.perf_counter() - start
+
+
+def report(title, rows):
+    print(title)
+    for name, value in rows:
+        print(f"  {name:<40} {value}")
@@ -6,17 +6,22 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     install_requires=[
-        "Django>=4.2.0",
+        "Django>=5.1.0",
         "djangorestframework>=3.14.0",
         "celery>=5.3.0",
         "django-celery-beat>=2.5.0",
         "redis>=4.6.0",
-        "psycopg2-binary>=2.9.0",
+        "psycopg[binary,pool]>=3.2.0",
         "aiogram>=3.0.0",
         "aiogram-dialog>=2.0.0",
         "python-dotenv>=1.0.0",
         "requests>=2.31.0",
         "django-cors-headers>=4.3.0",
         "gunicorn>=21.2.0",
+        "uvicorn>=0.30.0",
+        "uvicorn-worker>=0.2.0",
+        "orjson>=3.10.0",
+        "brotli>=1.1.0",
+        "zstandard>=0.23.0",
     ],
 )
@@ -7,7 +7,7 @@ from .models import Category, Task
 class TaskAdmin(admin.ModelAdmin):
     list_display = ("id", "title", "user", "completed", "due_date", "created_at")
     list_filter = ("completed", "due_date", "created_at", "user")
-    search_fields = ("id", "title", "description")
+    search_fields = ("title", "description")
     readonly_fields = ("id", "created_at", "updated_at")
     filter_horizontal = ("categories",)
 
@@ -22,7 +22,7 @@ class TaskAdmin(admin.ModelAdmin):
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "created_at")
-    search_fields = ("id", "name", "description")
+    search_fields = ("name", "description")
     readonly_fields = ("id", "created_at", "updated_at")
 
     fieldsets = (
@@ -0,0 +1,123 @@
+"""
+Async variants of the hot read endpoints, routed in place of the sync views
+when ``API_ASYNC_VIEWS`` is on (as under ``core.asgi``).
+
+A GET is answered on the event loop: the response cache is read through the
+async cache API and tasks are fetched with the async ORM, so one worker keeps
+serving other requests while a query is in flight. The JSON body, ETag and
+cache entries are the same as those of the sync views. Writes, HTTP Basic
+auth and the browsable API are handed to the sync DRF views.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+from . import views
+from .cache import acached_conditional_get, task_cache_version_keys
+from .conditional import aqueryset_version, make_etag
+from .fallback_user import aget_fallback_user
+from .fast_serializers import aserialize_task_rows, task_values
+from .fieldsets import load_fields, requested_fields
+from .filters import filter_tasks
+from .models import Task
+from .pagination import KeysetPagination
+from .renderers import ORJSONRenderer
+from .serializers import TaskSerializer
+
+_renderer = ORJSONRenderer()
+_task_list_create = views.TaskListCreateView.as_view()
+
+
+def _handled_by_sync_view(request):
+    return (
+        request.method != "GET"
+        or "HTTP_AUTHORIZATION" in request.META
+        or "format" in request.GET
+        or "text/html" in request.headers.get("Accept", "")
+    )
+
+
+# CSRF of writes is checked by the DRF views they are handed to
+@csrf_exempt
+async def task_list(request):
+    """TaskListCreateView with an async GET"""
+    if _handled_by_sync_view(request):
+        return await sync_to_async(_task_list_create)(request)
+    request.user = await request.auser()
+    if request.user.is_authenticated:
+        user = request.user
+    else:
+        user = await aget_fallback_user()
+    return await _task_page(request, user)
+
+
+@csrf_exempt
+async def telegram_user_tasks(request, telegram_id):
+    """get_user_by_telegram_id with an async GET"""
+    if _handled_by_sync_view(request):
+        return await sync_to_async(views.get_user_by_telegram_id)(
+            request, telegram_id=telegram_id
+        )
+    request.user = await request.auser()
+    return await _task_page(request, await aget_fallback_user())
+
+
+async def _task_page(request, user):
+    tasks = Task.objects.for_user(user).with_related() if user else Task.objects.none()
+    # Filters and the paginator only read query params from the DRF request
+    drf_request = Request(request)
+
+    try:
+        tasks = filter_tasks(drf_request, tasks)
+        fields = requested_fields(drf_request, TaskSerializer)
+        tasks = load_fields(tasks, fields)
+
+        async def validators():
+            version = await aqueryset_version(tasks, ("categories",))
+            return make_etag(request, version), None
+
+        async def render():
+            paginator = KeysetPagination()
+            if settings.API_FAST_TASK_READS:
+                page = await paginator.apaginate_queryset(
+                    task_values(tasks, fields), drf_request
+                )
+                return paginator.get_paginated_response(
+                    await aserialize_task_rows(page, using=tasks.db, fields=fields)
+                )
+            page = await paginator.apaginate_queryset(tasks, drf_request)
+            serializer = TaskSerializer(page, many=True, fields=fields)
+            return paginator.get_paginated_response(serializer.data)
+
+        response = await acached_conditional_get(
+            request, task_cache_version_keys(user), validators, render, versioned=True
+        )
+    except APIException as exc:
+        response = exception_handler(exc, {})
+    return _as_json(response)
+
+
+def _as_json(response):
+    """
+    Plain HttpResponse with the body the JSON renderer of a DRF view would
+    produce; Django would render a DRF Response in a worker thread.
+    """
+    if isinstance(response, Response):
+        rendered = HttpResponse(
+            _renderer.render(response.data),
+            status=response.status_code,
+            content_type="application/json",
+        )
+        for name, value in response.items():
+            if name.lower() != "content-type":
+                rendered[name] = value
+        response = rendered
+    patch_vary_headers(response, ("Accept",))
+    return response
@@ -0,0 +1,184 @@
+"""
+Batched task writes behind the /api/tasks/bulk/ endpoint.
+
+Every item is validated with TaskSerializer first; if any item fails nothing
+is written and the errors are reported per item. Otherwise all creates,
+updates, category links and deletes run as a handful of bulk queries inside a
+single transaction.
+"""
+
+from core.id_generator import generate_task_ids
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from .cache import invalidate_user_tasks
+from .models import Category, Task
+from .serializers import TaskSerializer
+from .stats import record_task_changes
+
+TaskCategory = Task.categories.through
+
+
+def _clean_task_id(value):
+    """``value`` as a task id, as CustomIDField reads it, or None if invalid"""
+    if isinstance(value, bool) or not isinstance(value, (str, int)):
+        return None
+    return Task._meta.pk.to_python(value) or None
+
+
+class TaskBulkWriter:
+    batch_size = 1000
+
+    def __init__(self, user):
+        self.user = user
+        self.errors = {}
+        self._creates = []
+        self._updates = []
+        self._deletes = []
+        self._category_ids = set()
+
+    def validate(self, create=(), update=(), delete=()):
+        """Validate every item; returns False and fills ``errors`` on failure."""
+        self._validate_creates(create)
+        self._validate_updates(update)
+        self._validate_deletes(delete)
+
+        # Unknown category ids are ignored, as in TaskSerializer
+        self._category_ids = set(
+            Category.objects.filter(id__in=self._category_ids).values_list(
+                "id", flat=True
+            )
+        )
+        return not self.errors
+
+    def save(self):
+        """Apply the validated items and return the affected tasks."""
+        now = timezone.now()
+        links = []
+
+        with transaction.atomic():
+            ids = generate_task_ids(len(self._creates))
+            created = [
+                Task(id=task_id, user=self.user, **data)
+                for task_id, (data, _) in zip(ids, self._creates)
+            ]
+            Task.objects.bulk_create(created, batch_size=self.batch_size)
+            stats_changes = [(None, task.stats_state()) for task in created]
+            for task, (_, category_ids) in zip(created, self._creates):
+                links.extend(self._links(task, category_ids))
+
+            updated, fields, relinked = [], {"updated_at"}, []
+            for task, data, category_ids in self._updates:
+                old_state = task.stats_state()
+                fields.update(TaskSerializer.assign_fields(task, data))
+                task.updated_at = now
+                stats_changes.append((old_state, task.stats_state()))
+                updated.append(task)
+                if category_ids is not None:
+                    relinked.append(task.id)
+                    links.extend(self._links(task, category_ids))
+            if updated:
+                Task.objects.bulk_update(
+                    updated, sorted(fields), batch_size=self.batch_size
+                )
+
+            # One delete and one insert on the through table for all tasks
+            if relinked:
+                TaskCategory.objects.filter(task_id__in=relinked).delete()
+            TaskCategory.objects.bulk_create(links, batch_size=self.batch_size)
+
+            if self._deletes:
+                Task.objects.filter(id__in=self._deletes).delete()
+
+            # Bulk queries send no model signals (deletes above do)
+            invalidate_user_tasks(self.user.pk)
+            record_task_changes(stats_changes)
+
+        return {
+            "created": self._fetch([task.id for task in created]),
+            "updated": self._fetch([task.id for task in updated]),
+            "deleted": list(self._deletes),
+        }
+
+    def _validate_creates(self, items):
+        # One serializer validates every item, so DRF builds its fields once
+        serializer = TaskSerializer()
+        errors = []
+        for index, item in enumerate(items):
+            try:
+                data = dict(serializer.run_validation(item))
+            except ValidationError as exc:
+                errors.append({"index": index, "errors": as_serializer_error(exc)})
+                continue
+            category_ids = data.pop("category_ids", [])
+            self._category_ids.update(category_ids)
+            self._creates.append((data, category_ids))
+        self._add_errors("create", errors)
+
+    def _validate_updates(self, items):
+        ids = [_clean_task_id(item.get("id")) for item in items]
+        tasks = Task.objects.for_user(self.user).in_bulk(
+            [task_id for task_id in ids if task_id]
+        )
+
+        serializer = TaskSerializer(partial=True)
+        errors = []
+        for index, (task_id, item) in enumerate(zip(ids, items)):
+            if "id" not in item:
+                errors.append(
+                    {"index": index, "errors": {"id": ["This field is required."]}}
+                )
+                continue
+            if task_id is None:
+                errors.append({"index": index, "errors": {"id": ["Invalid task id."]}})
+                continue
+            task = tasks.get(task_id)
+            if task is None:
+                errors.append({"index": index, "errors": {"id": ["Task not found."]}})
+                continue
+
+            serializer.instance = task
+            try:
+                data = dict(serializer.run_validation(item))
+            except ValidationError as exc:
+                errors.append({"index": index, "errors": as_serializer_error(exc)})
+                continue
+            category_ids = data.pop("category_ids", None)
+            self._category_ids.update(category_ids or ())
+            self._updates.append((task, data, category_ids))
+        self._add_errors("update", errors)
+
+    def _validate_deletes(self, ids):
+        existing = set(
+            Task.objects.for_user(self.user)
+            .filter(id__in=ids)
+            .values_list("id", flat=True)
+        )
+        errors = [
+            {"index": index, "errors": {"id": ["Task not found."]}}
+            for index, task_id in enumerate(ids)
+            if task_id not in existing
+        ]
+        self._add_errors("delete", errors)
+        self._deletes = list(dict.fromkeys(ids))
+
+    def _add_errors(self, section, errors):
+        if errors:
+            self.errors[section] = errors
+
+    def _links(self, task, category_ids):
+        return [
+            TaskCategory(task_id=task.id, category_id=category_id)
+            for category_id in dict.fromkeys(category_ids)
+            if category_id in self._category_ids
+        ]
+
+    def _fetch(self, ids):
+        if not ids:
+            return []
+        tasks = Task.objects.filter(id__in=ids).with_related().in_bulk()
+        # Tasks that were updated and deleted in the same request are skipped
+        ordered = [tasks[task_id] for task_id in dict.fromkeys(ids) if task_id in tasks]
+        return TaskSerializer(ordered, many=True).data
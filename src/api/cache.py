@@ -0,0 +1,341 @@
+"""
+Read-through cache of serialized task lists and category payloads.
+
+Entries live in the default Django cache (Redis) under keys that embed
+version counters: one per user for their tasks and one for all categories,
+which are nested in every task payload. Writes never delete entries, they
+bump the matching version (see ``api.signals``), so every cached response of
+that user becomes unreachable at once and simply expires.
+
+Each entry stores the ETag next to the data, so a warm poll, conditional or
+not, is answered without touching the database. The ETag of a list is made
+from the same version counters, so a cold one is not scanned for it either.
+On a miss only one process renders a given entry; the others wait for it
+instead of piling onto the database (stampede protection).
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+
+from core.db_router import current_read_db
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+
+from .conditional import (
+    ConditionalGetMixin,
+    aconditional_get,
+    conditional_get,
+    is_conditional,
+    make_etag,
+)
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES_VERSION_KEY = "api:categories:version"
+
+# How long a renderer may hold the lock, and how often waiters re-check
+LOCK_TIMEOUT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+_stats = {"hits": 0, "misses": 0, "waits": 0, "errors": 0}
+
+
+def task_version_key(user_id):
+    return f"api:tasks:{user_id}:version"
+
+
+def task_cache_version_keys(user):
+    """Version keys of a payload with the tasks of ``user`` (may be None)"""
+    return [task_version_key(user.pk if user else None), CATEGORIES_VERSION_KEY]
+
+
+def _cache_call(method, *args):
+    # A cache outage degrades to uncached reads instead of failing requests
+    try:
+        return getattr(cache, method)(*args)
+    except Exception:
+        _stats["errors"] += 1
+        logger.warning("Response cache %s failed", method, exc_info=True)
+        return None
+
+
+async def _acache_call(method, *args):
+    try:
+        return await getattr(cache, f"a{method}")(*args)
+    except Exception:
+        _stats["errors"] += 1
+        logger.warning("Response cache %s failed", method, exc_info=True)
+        return None
+
+
+def get_versions(keys):
+    """Current value of each version key; a missing one is started afresh"""
+    versions = _cache_call("get_many", keys)
+    if versions is None:
+        return None
+    for key in keys:
+        if key not in versions:
+            # A clock-based start never repeats a value of an evicted counter
+            version = time.time_ns()
+            if not _cache_call("add", key, version, None):
+                version = _cache_call("get", key) or version
+            versions[key] = version
+    return [versions[key] for key in keys]
+
+
+async def aget_versions(keys):
+    versions = await _acache_call("get_many", keys)
+    if versions is None:
+        return None
+    for key in keys:
+        if key not in versions:
+            version = time.time_ns()
+            if not await _acache_call("add", key, version, None):
+                version = await _acache_call("get", key) or version
+            versions[key] = version
+    return [versions[key] for key in keys]
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Not set yet: any new value invalidates what was cached before
+        _cache_call("set", key, time.time_ns(), None)
+    except Exception:
+        _stats["errors"] += 1
+        logger.warning("Response cache version bump failed", exc_info=True)
+
+
+def _bump_now_and_on_commit(key):
+    # Bump right away and once more after commit, so a concurrent request
+    # cannot cache the pre-commit state under the new version
+    _bump(key)
+    transaction.on_commit(lambda: _bump(key))
+
+
+def invalidate_user_tasks(user_id):
+    """Drop every cached task payload of one user"""
+    _bump_now_and_on_commit(task_version_key(user_id))
+
+
+def invalidate_categories():
+    """Drop every cached category and task payload"""
+    _bump_now_and_on_commit(CATEGORIES_VERSION_KEY)
+
+
+def _response_cache_key(request, versions):
+    if versions is None:
+        return None
+    parts = [
+        request.build_absolute_uri(),
+        str(request.user.pk),
+        # Clients pinned to the primary must not get what a lagging replica
+        # rendered after their write
+        current_read_db(),
+        *map(str, versions),
+    ]
+    digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+    return f"api:response:{digest.hexdigest()}"
+
+
+def versioned_etag(request, version_keys, versions):
+    """
+    ETag of a payload from the current ``versions`` of its version keys; it
+    changes with every write that invalidates the cached payload
+    """
+    version = {
+        "db": current_read_db(),
+        "versions": tuple(zip(version_keys, versions)),
+    }
+    return make_etag(request, version)
+
+
+def _get_or_fill(key, fill):
+    entry = _cache_call("get", key)
+    if entry is not None:
+        _stats["hits"] += 1
+        return entry, None
+
+    lock_key = f"{key}:lock"
+    locked = _cache_call("add", lock_key, 1, LOCK_TIMEOUT)
+    if locked is False:
+        # Someone else is rendering this entry; wait for their result
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            entry = _cache_call("get", key)
+            if entry is not None:
+                _stats["waits"] += 1
+                return entry, None
+
+    _stats["misses"] += 1
+    try:
+        entry, response = fill()
+        if entry is not None:
+            _cache_call("set", key, entry, settings.API_RESPONSE_CACHE_TIMEOUT)
+    finally:
+        if locked:
+            _cache_call("delete", lock_key)
+    return entry, response
+
+
+async def _aget_or_fill(key, fill):
+    entry = await _acache_call("get", key)
+    if entry is not None:
+        _stats["hits"] += 1
+        return entry, None
+
+    lock_key = f"{key}:lock"
+    locked = await _acache_call("add", lock_key, 1, LOCK_TIMEOUT)
+    if locked is False:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            entry = await _acache_call("get", key)
+            if entry is not None:
+                _stats["waits"] += 1
+                return entry, None
+
+    _stats["misses"] += 1
+    try:
+        entry, response = await fill()
+        if entry is not None:
+            await _acache_call("set", key, entry, settings.API_RESPONSE_CACHE_TIMEOUT)
+    finally:
+        if locked:
+            await _acache_call("delete", lock_key)
+    return entry, response
+
+
+def cached_conditional_get(request, version_keys, validators, render, versioned=False):
+    """
+    Cached counterpart of ``conditional_get``: ``validators()`` returns the
+    ETag and Last-Modified timestamp, ``render()`` the full response. Both are
+    only called on a cache miss.
+
+    With ``versioned`` (lists, which have no Last-Modified) the ETag comes
+    from the version counters and ``validators()`` is only called when they
+    are unavailable and the request is conditional.
+    """
+    versions = None
+    if versioned or settings.API_RESPONSE_CACHE_TIMEOUT:
+        versions = get_versions(version_keys)
+    if versioned:
+        validators = _versioned(request, version_keys, versions, validators)
+
+    key = None
+    if settings.API_RESPONSE_CACHE_TIMEOUT:
+        key = _response_cache_key(request, versions)
+    if key is None:
+        return conditional_get(request, *validators(), render)
+
+    def fill():
+        etag, last_modified = validators()
+        response = render()
+        if response.status_code != 200:
+            return None, response
+        entry = {"etag": etag, "last_modified": last_modified, "data": response.data}
+        return entry, response
+
+    entry, response = _get_or_fill(key, fill)
+    if entry is None:
+        return response
+    return conditional_get(
+        request,
+        entry["etag"],
+        entry["last_modified"],
+        lambda: response if response is not None else Response(entry["data"]),
+    )
+
+
+async def acached_conditional_get(
+    request, version_keys, validators, render, versioned=False
+):
+    """cached_conditional_get() for async views; both callables are async"""
+    versions = None
+    if versioned or settings.API_RESPONSE_CACHE_TIMEOUT:
+        versions = await aget_versions(version_keys)
+    if versioned:
+        validators = _aversioned(request, version_keys, versions, validators)
+
+    key = None
+    if settings.API_RESPONSE_CACHE_TIMEOUT:
+        key = _response_cache_key(request, versions)
+    if key is None:
+        etag, last_modified = await validators()
+        return await aconditional_get(request, etag, last_modified, render)
+
+    async def fill():
+        etag, last_modified = await validators()
+        response = await render()
+        if response.status_code != 200:
+            return None, response
+        entry = {"etag": etag, "last_modified": last_modified, "data": response.data}
+        return entry, response
+
+    entry, response = await _aget_or_fill(key, fill)
+    if entry is None:
+        return response
+    if response is None:
+        response = Response(entry["data"])
+    return conditional_get(
+        request, entry["etag"], entry["last_modified"], lambda: response
+    )
+
+
+def _versioned(request, version_keys, versions, validators):
+    def versioned_validators():
+        if versions is not None:
+            return versioned_etag(request, version_keys, versions), None
+        # Without the cache an ETag costs a scan, only worth it for a request
+        # that can be answered with 304
+        if is_conditional(request):
+            return validators()
+        return None, None
+
+    return versioned_validators
+
+
+def _aversioned(request, version_keys, versions, validators):
+    async def versioned_validators():
+        if versions is not None:
+            return versioned_etag(request, version_keys, versions), None
+        if is_conditional(request):
+            return await validators()
+        return None, None
+
+    return versioned_validators
+
+
+def get_response_cache_stats():
+    """Return hit/miss counters of this process and the resulting hit rate."""
+    stats = dict(_stats)
+    served = stats["hits"] + stats["waits"]
+    total = served + stats["misses"]
+    stats["hit_rate"] = served / total if total else 0.0
+    return stats
+
+
+class CachedConditionalGetMixin(ConditionalGetMixin):
+    """
+    ConditionalGetMixin backed by the response cache. Views list the version
+    keys their payload depends on in ``get_cache_version_keys()``.
+    """
+
+    def get_cache_version_keys(self):
+        return [CATEGORIES_VERSION_KEY]
+
+    def conditional_response(self, request, queryset, render, last_modified=False):
+        return cached_conditional_get(
+            request,
+            self.get_cache_version_keys(),
+            lambda: self.get_validators(request, queryset, last_modified),
+            render,
+            # Detail views keep Last-Modified, from their single row
+            versioned=not last_modified,
+        )
@@ -0,0 +1,146 @@
+"""
+Conditional GET for the task and category endpoints.
+
+Validators are computed from one aggregate query over the (filtered)
+queryset, ``max(updated_at)`` plus row counts, so an unchanged poll is
+answered with 304 Not Modified before anything is fetched or serialized.
+Cached lists derive their ETag from the response cache's version counters
+instead (see ``api.cache``), which costs no query at all.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+
+def _version_fields(related):
+    fields = {
+        "count": Count("pk", distinct=bool(related)),
+        "updated_at": Max("updated_at"),
+    }
+    for name in related:
+        fields[f"{name}_count"] = Count(name)
+        fields[f"{name}_updated_at"] = Max(f"{name}__updated_at")
+    return fields
+
+
+def queryset_version(queryset, related=()):
+    """
+    Aggregate that changes whenever a row of ``queryset`` (or one of the
+    ``related`` many-to-many rows rendered with it) is added, changed or
+    removed.
+    """
+    return queryset.order_by().aggregate(**_version_fields(related))
+
+
+async def aqueryset_version(queryset, related=()):
+    return await queryset.order_by().aaggregate(**_version_fields(related))
+
+
+def make_etag(request, version):
+    """Weak ETag for this URL (query string included) and user"""
+    parts = [
+        request.get_full_path(),
+        str(request.user.pk),
+        *(
+            value.isoformat() if hasattr(value, "isoformat") else str(value)
+            for value in version.values()
+        ),
+    ]
+    digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def is_conditional(request):
+    """Whether ``request`` carries validators to compare with"""
+    headers = request.headers
+    return "If-None-Match" in headers or "If-Modified-Since" in headers
+
+
+def conditional_get(request, etag, last_modified, render):
+    """
+    304 if the request's validators match ``etag``/``last_modified`` (a Unix
+    timestamp or None), otherwise ``render()`` with the validators attached.
+    Without an ``etag`` (nor ``last_modified``) it only renders.
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = render()
+        if response.status_code != 200:
+            return response
+    return _set_validators(response, etag, last_modified)
+
+
+async def aconditional_get(request, etag, last_modified, render):
+    """conditional_get() with an async ``render()``"""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = await render()
+        if response.status_code != 200:
+            return response
+    return _set_validators(response, etag, last_modified)
+
+
+def _set_validators(response, etag, last_modified):
+    if etag is not None:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag support for DRF list and retrieve views.
+
+    ``conditional_related`` names many-to-many relations whose rows are part
+    of the response (e.g. nested categories of a task). Detail views also get
+    a Last-Modified header; list views do not, since a deleted row does not
+    move ``max(updated_at)`` and If-Modified-Since would then serve a stale
+    list.
+    """
+
+    conditional_related = ()
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        def render():
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            return Response(self.get_serializer(queryset, many=True).data)
+
+        return self.conditional_response(request, queryset, render)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+
+        def render():
+            instance = get_object_or_404(queryset)
+            self.check_object_permissions(request, instance)
+            return Response(self.get_serializer(instance).data)
+
+        return self.conditional_response(request, queryset, render, last_modified=True)
+
+    def conditional_response(self, request, queryset, render, last_modified=False):
+        etag, timestamp = self.get_validators(request, queryset, last_modified)
+        return conditional_get(request, etag, timestamp, render)
+
+    def get_validators(self, request, queryset, last_modified=False):
+        """ETag and, if requested, Last-Modified timestamp of ``queryset``"""
+        version = queryset_version(queryset, self.conditional_related)
+        timestamp = version["updated_at"]
+        if last_modified and timestamp is not None:
+            timestamp = int(timestamp.timestamp())
+        else:
+            timestamp = None
+        return make_etag(request, version), timestamp
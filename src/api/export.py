@@ -0,0 +1,114 @@
+"""
+Streaming export of tasks as NDJSON or CSV, behind /api/tasks/export/.
+
+Tasks are read through a server-side cursor (``QuerySet.iterator``) and
+serialized one chunk at a time, with the categories of each chunk fetched by
+one prefetch query. The response is sent while it is being produced, so an
+export of any size runs in constant memory and the first bytes go out right
+away. Under ASGI the chunks are produced in a worker thread one at a time
+(``aiter_rows``), as Django would otherwise read a sync iterator whole before
+sending it.
+"""
+
+import csv
+import io
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import BaseRenderer
+
+from .renderers import ORJSONRenderer
+from .serializers import TaskSerializer
+
+CSV_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "completed",
+    "due_date",
+    "notified_at",
+    "created_at",
+    "updated_at",
+    "category_ids",
+]
+
+_json = ORJSONRenderer()
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON; a single object (e.g. an error) is one line"""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _json.render(data) + b"\n"
+
+
+class CSVRenderer(BaseRenderer):
+    """CSV; error payloads are rendered as ``field,message`` rows"""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        items = data.items() if isinstance(data, dict) else [("detail", data)]
+        writer.writerows((key, value) for key, value in items)
+        return buffer.getvalue().encode(self.charset)
+
+
+def iter_chunks(queryset, chunk_size):
+    """Lists of at most ``chunk_size`` tasks, read through a server-side cursor"""
+    iterator = queryset.prefetch_related("categories").iterator(chunk_size=chunk_size)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield chunk
+
+
+def ndjson_rows(queryset, chunk_size):
+    for chunk in iter_chunks(queryset, chunk_size):
+        data = TaskSerializer(chunk, many=True).data
+        yield b"".join(_json.render(item) + b"\n" for item in data)
+
+
+def csv_rows(queryset, chunk_size):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    # The header goes out before the first query finishes
+    yield _drain(buffer)
+
+    for chunk in iter_chunks(queryset, chunk_size):
+        for item in TaskSerializer(chunk, many=True).data:
+            item["category_ids"] = ";".join(
+                category["id"] for category in item["categories"]
+            )
+            writer.writerow(item)
+        yield _drain(buffer)
+
+
+async def aiter_rows(rows):
+    """The chunks of the sync iterator ``rows``, each produced in a thread"""
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(rows, None)) is not None:
+            yield chunk
+    finally:
+        # Closes the server-side cursor when the client goes away early
+        await sync_to_async(rows.close)()
+
+
+def _drain(buffer):
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value.encode("utf-8")
+
+
+EXPORT_FORMATS = {
+    NDJSONRenderer.format: (ndjson_rows, "tasks.ndjson"),
+    CSVRenderer.format: (csv_rows, "tasks.csv"),
+}
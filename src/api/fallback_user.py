@@ -0,0 +1,68 @@
+"""
+Process-wide cache of the "demo" user that anonymous and bot requests fall
+back to, so they do not pay an ``ORDER BY id LIMIT 1`` query per request.
+
+The cached user is dropped by the User signals in ``api.signals`` of this
+process and expires after API_FALLBACK_USER_TTL seconds, which bounds how
+long a deletion in another process goes unnoticed. "No user" is not cached,
+so a user created elsewhere is found by the next request.
+"""
+
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+
+_lock = threading.Lock()
+# (user, monotonic expiry), replaced as a whole
+_entry = (None, 0.0)
+_stats = {"hits": 0, "misses": 0}
+
+
+def _cached_user():
+    user, expires = _entry
+    if user is not None and time.monotonic() < expires:
+        _stats["hits"] += 1
+        return user
+    return None
+
+
+def get_fallback_user():
+    """Return the first user (or None), querying the database once per TTL."""
+    global _entry
+
+    user = _cached_user()
+    if user is not None:
+        return user
+
+    with _lock:
+        user = _cached_user()
+        if user is None:
+            _stats["misses"] += 1
+            user = User.objects.first()
+            if user is not None:
+                _entry = (user, time.monotonic() + settings.API_FALLBACK_USER_TTL)
+        return user
+
+
+async def aget_fallback_user():
+    """get_fallback_user() for async views; only a miss leaves the event loop."""
+    user = _cached_user()
+    if user is not None:
+        return user
+    return await sync_to_async(get_fallback_user)()
+
+
+def invalidate_fallback_user():
+    """Forget the cached user; the next lookup goes to the database."""
+    global _entry
+
+    with _lock:
+        _entry = (None, 0.0)
+
+
+def get_fallback_user_stats():
+    """Return hit/miss counters of the fallback user cache."""
+    return dict(_stats)
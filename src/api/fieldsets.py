@@ -0,0 +1,109 @@
+"""
+Sparse fieldsets for the task and category endpoints.
+
+A read with ``?fields=title,created_at`` renders only those fields, one with
+``?exclude=description`` all but those; the id is always included. Only what
+is rendered is loaded: the other columns are deferred and the categories of
+tasks are not prefetched unless they are requested. Writes ignore both
+parameters.
+"""
+
+from functools import cache
+
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+from .pagination import KeysetPagination
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+
+@cache
+def _readable_fields(serializer_class):
+    return tuple(
+        name
+        for name, field in serializer_class().fields.items()
+        if not field.write_only
+    )
+
+
+def requested_fields(request, serializer_class):
+    """
+    Readable fields of ``serializer_class`` to render for ``request``, in
+    serializer order, or None for all of them
+    """
+    params = request.query_params
+    if request.method not in SAFE_METHODS or not (
+        FIELDS_PARAM in params or EXCLUDE_PARAM in params
+    ):
+        return None
+
+    available = _readable_fields(serializer_class)
+    selected, errors = set(available), {}
+    for param in (FIELDS_PARAM, EXCLUDE_PARAM):
+        if param not in params:
+            continue
+        names = {name.strip() for name in params[param].split(",") if name.strip()}
+        unknown = names.difference(available)
+        if unknown:
+            errors[param] = [
+                f"Unknown field(s): {', '.join(sorted(unknown))}. "
+                f"Must be among {', '.join(available)}."
+            ]
+        elif param == FIELDS_PARAM:
+            selected = names
+        else:
+            selected -= names
+    if errors:
+        raise ValidationError(errors)
+    return tuple(name for name in available if name in selected or name == "id")
+
+
+def cursor_fields(queryset, view=None):
+    """Fields KeysetPagination reads from the last rows of a page"""
+    field, tiebreaker = KeysetPagination().get_ordering(None, queryset, view)
+    return {field.lstrip("-"), tiebreaker}
+
+
+def load_fields(queryset, fields, view=None):
+    """
+    ``queryset`` loading only what ``fields`` of its serializer need (all
+    fields if None), plus what pagination reads
+    """
+    if fields is None:
+        return queryset
+    opts = queryset.model._meta
+    loaded = {*fields, *cursor_fields(queryset, view)}
+
+    deferred = [
+        field.name
+        for field in opts.concrete_fields
+        if field.name not in loaded and not field.primary_key
+    ]
+    if any(opts.get_field(name).is_relation for name in deferred):
+        # A deferred foreign key cannot be joined
+        queryset = queryset.select_related(None)
+    if deferred:
+        queryset = queryset.defer(*deferred)
+
+    prefetched = [field.name for field in opts.many_to_many if field.name in loaded]
+    return queryset.prefetch_related(None).prefetch_related(*prefetched)
+
+
+class SparseFieldsetMixin:
+    """Generic view honouring ``?fields=`` and ``?exclude=`` on reads"""
+
+    @cached_property
+    def sparse_fields(self):
+        return requested_fields(self.request, self.get_serializer_class())
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return load_fields(queryset, self.sparse_fields, self)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.sparse_fields is not None:
+            kwargs.setdefault("fields", self.sparse_fields)
+        return super().get_serializer(*args, **kwargs)
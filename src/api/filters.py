@@ -0,0 +1,144 @@
+from datetime import datetime, time
+
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Task
+
+# Must stay in sync with the task_search_idx expression index (migration 0006)
+TASK_SEARCH_CONFIG = "simple"
+
+
+def task_search_vector():
+    return SearchVector("title", "description", config=TASK_SEARCH_CONFIG)
+
+
+class TaskFilter(BaseFilterBackend):
+    """
+    ?completed=true|false, ?due_after=/?due_before= (ISO date or datetime) and
+    ?category=<id>[,<id>...]
+    """
+
+    true_values = {"true", "1", "yes"}
+    false_values = {"false", "0", "no"}
+
+    def filter_queryset(self, request, queryset, view=None):
+        params = request.query_params
+
+        completed = params.get("completed")
+        if completed is not None:
+            queryset = queryset.filter(
+                completed=self._parse_bool("completed", completed)
+            )
+
+        due_after = params.get("due_after")
+        if due_after:
+            queryset = queryset.filter(
+                due_date__gte=self._parse_datetime("due_after", due_after)
+            )
+        due_before = params.get("due_before")
+        if due_before:
+            queryset = queryset.filter(
+                due_date__lte=self._parse_datetime("due_before", due_before)
+            )
+
+        category = params.get("category")
+        if category:
+            # A subquery on the through table avoids duplicate rows for tasks
+            # that match several of the requested categories
+            task_ids = Task.categories.through.objects.filter(
+                category_id__in=category.split(",")
+            ).values("task_id")
+            queryset = queryset.filter(id__in=task_ids)
+
+        return queryset
+
+    def _parse_bool(self, name, value):
+        value = value.lower()
+        if value in self.true_values:
+            return True
+        if value in self.false_values:
+            return False
+        raise ValidationError({name: ["Must be true or false."]})
+
+    def _parse_datetime(self, name, value):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            date = parse_date(value)
+            if date is None:
+                raise ValidationError({name: ["Must be an ISO 8601 date or datetime."]})
+            parsed = datetime.combine(date, time.min)
+        if is_naive(parsed):
+            parsed = make_aware(parsed)
+        return parsed
+
+
+class TaskSearchFilter(BaseFilterBackend):
+    """
+    ?search=<terms> over title and description.
+
+    On PostgreSQL this is a full-text match (websearch syntax) served by the
+    task_search_idx GIN index; other databases fall back to icontains.
+    """
+
+    search_param = "search"
+
+    def filter_queryset(self, request, queryset, view=None):
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+
+        if connections[queryset.db].vendor != "postgresql":
+            return queryset.filter(
+                Q(title__icontains=terms) | Q(description__icontains=terms)
+            )
+
+        return queryset.annotate(search_vector=task_search_vector()).filter(
+            search_vector=SearchQuery(
+                terms, config=TASK_SEARCH_CONFIG, search_type="websearch"
+            )
+        )
+
+
+class TaskOrderingFilter(BaseFilterBackend):
+    """
+    ?ordering=<field> or -<field> for whitelisted, indexed fields.
+
+    Only the first term is used; KeysetPagination picks it up from the
+    queryset and adds the primary key as tiebreaker.
+    """
+
+    ordering_param = "ordering"
+    ordering_fields = ("created_at", "due_date", "title")
+
+    def filter_queryset(self, request, queryset, view=None):
+        ordering = request.query_params.get(self.ordering_param)
+        if not ordering:
+            return queryset
+
+        term = ordering.split(",")[0].strip()
+        if term.lstrip("-") not in self.ordering_fields:
+            raise ValidationError(
+                {
+                    self.ordering_param: [
+                        f"Must be one of {', '.join(self.ordering_fields)}, "
+                        "optionally prefixed with '-'."
+                    ]
+                }
+            )
+        return queryset.order_by(term)
+
+
+TASK_FILTER_BACKENDS = [TaskFilter, TaskSearchFilter, TaskOrderingFilter]
+
+
+def filter_tasks(request, queryset):
+    """Apply the task filter backends outside of a generic view"""
+    for backend in TASK_FILTER_BACKENDS:
+        queryset = backend().filter_queryset(request, queryset)
+    return queryset
@@ -0,0 +1,221 @@
+"""
+Streaming bulk import of tasks, behind the import_tasks management command
+and /api/tasks/import/.
+
+Rows are read one at a time from NDJSON or CSV (the formats of
+/api/tasks/export/), validated with TaskSerializer a batch at a time and
+written with IDs allocated up front by the ID generator. On PostgreSQL tasks
+and category links are loaded with COPY; other databases use bulk_create.
+Invalid rows are reported with their line number and skipped; everything
+else is imported in one transaction.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from core.id_generator import generate_task_ids
+from django.db import connections, models, router, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+
+from .cache import invalidate_user_tasks
+from .models import Category, Task
+from .serializers import TaskSerializer
+from .stats import record_task_changes
+
+TaskCategory = Task.categories.through
+
+IMPORT_FORMATS = ("ndjson", "csv")
+
+
+def read_rows(lines, format="ndjson"):
+    """
+    ``(line number, row, error)`` for each record of an iterable of byte
+    lines (e.g. a file or a request); ``row`` is None if it did not parse.
+    """
+    if format == "csv":
+        return _read_csv(lines)
+    return _read_ndjson(lines)
+
+
+INVALID_UTF8 = {"non_field_errors": ["Invalid UTF-8."]}
+
+
+def _read_ndjson(lines):
+    for number, line in enumerate(lines, start=1):
+        try:
+            line = line.decode("utf-8")
+        except UnicodeDecodeError:
+            yield number, None, INVALID_UTF8
+            continue
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield number, None, {"non_field_errors": ["Invalid JSON."]}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {"non_field_errors": ["Expected an object."]}
+            continue
+        # Exported tasks carry nested categories
+        if "category_ids" not in row and isinstance(row.get("categories"), list):
+            row["category_ids"] = [
+                category["id"]
+                for category in row["categories"]
+                if isinstance(category, dict) and "id" in category
+            ]
+        yield number, row, None
+
+
+class _DecodedLines:
+    """
+    Iterator decoding byte lines one at a time. A line that is not UTF-8
+    raises UnicodeDecodeError from ``next()`` and is skipped; iteration goes
+    on with the following line.
+    """
+
+    def __init__(self, lines):
+        self._lines = iter(lines)
+        self.number = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self._lines)
+        self.number += 1
+        # Spreadsheets save CSV with a byte order mark
+        return line.decode("utf-8-sig" if self.number == 1 else "utf-8")
+
+
+def _read_csv(lines):
+    lines = _DecodedLines(lines)
+    reader = csv.DictReader(lines)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            yield lines.number, None, INVALID_UTF8
+            continue
+        except csv.Error as exc:
+            yield lines.number, None, {"non_field_errors": [f"Invalid CSV: {exc}."]}
+            continue
+        # Empty cells are missing values, e.g. a task without a due date
+        row = {key: value for key, value in row.items() if key and value}
+        if "category_ids" in row:
+            row["category_ids"] = row["category_ids"].split(";")
+        yield lines.number, row, None
+
+
+class TaskImporter:
+    batch_size = 5000
+    # Errors beyond this many are counted but not listed
+    max_reported_errors = 100
+
+    def __init__(self, user, batch_size=None):
+        self.user = user
+        self.batch_size = batch_size or self.batch_size
+        self.db = router.db_for_write(Task)
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        # One serializer validates every row, so DRF builds its fields once
+        self._serializer = TaskSerializer()
+
+    def run(self, rows):
+        """Import ``read_rows()`` output and return a summary"""
+        rows = iter(rows)
+        with transaction.atomic(using=self.db):
+            while batch := list(islice(rows, self.batch_size)):
+                self._write(*self._validate(batch))
+            if self.imported:
+                invalidate_user_tasks(self.user.pk)
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+    def _validate(self, batch):
+        valid = []
+        for number, row, error in batch:
+            if error is None:
+                try:
+                    data = dict(self._serializer.run_validation(row))
+                except ValidationError as exc:
+                    error = as_serializer_error(exc)
+            if error is not None:
+                self._add_error(number, error)
+                continue
+            valid.append((data, data.pop("category_ids", [])))
+
+        # Unknown category ids are ignored, as in TaskSerializer
+        known = set(
+            Category.objects.using(self.db)
+            .filter(id__in={i for _, ids in valid for i in ids})
+            .values_list("id", flat=True)
+        )
+        now = timezone.now()
+        tasks, links = [], []
+        for task_id, (data, category_ids) in zip(generate_task_ids(len(valid)), valid):
+            tasks.append(
+                Task(id=task_id, user=self.user, created_at=now, updated_at=now, **data)
+            )
+            links.extend(
+                TaskCategory(task_id=task_id, category_id=category_id)
+                for category_id in dict.fromkeys(category_ids)
+                if category_id in known
+            )
+        return tasks, links
+
+    def _write(self, tasks, links):
+        if not tasks:
+            return
+        connection = connections[self.db]
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                # COPY needs psycopg 3
+                if hasattr(cursor, "copy"):
+                    _copy(cursor, connection, Task, tasks)
+                    _copy(cursor, connection, TaskCategory, links)
+                    self._written(tasks)
+                    return
+        Task.objects.using(self.db).bulk_create(tasks, batch_size=1000)
+        TaskCategory.objects.using(self.db).bulk_create(links, batch_size=1000)
+        self._written(tasks)
+
+    def _written(self, tasks):
+        self.imported += len(tasks)
+        # Bulk writes send no model signals
+        record_task_changes((None, task.stats_state()) for task in tasks)
+
+    def _add_error(self, number, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({"line": number, "errors": errors})
+
+
+def _copy(cursor, connection, model, objs):
+    """Load ``objs`` into the table of ``model`` with COPY ... FROM STDIN"""
+    if not objs:
+        return
+    fields = [
+        field
+        for field in model._meta.concrete_fields
+        # The auto-increment id of the M2M through table
+        if not isinstance(field, models.AutoField)
+    ]
+    quote = connection.ops.quote_name
+    sql = "COPY {} ({}) FROM STDIN".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+    )
+    with cursor.copy(sql) as copy:
+        for obj in objs:
+            copy.write_row(
+                [
+                    field.get_db_prep_save(getattr(obj, field.attname), connection)
+                    for field in fields
+                ]
+            )
@@ -0,0 +1,50 @@
+import sys
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.importer import IMPORT_FORMATS, TaskImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = "Import tasks of one user from an NDJSON or CSV file (- for stdin)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for stdin")
+        parser.add_argument("--user", required=True, help="Username of the owner")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Input format; by default taken from the file extension",
+        )
+        parser.add_argument("--batch-size", type=int, default=TaskImporter.batch_size)
+
+    def handle(self, *args, path, user, format, batch_size, **options):
+        try:
+            owner = User.objects.get(username=user)
+        except User.DoesNotExist:
+            raise CommandError(f"User {user!r} does not exist")
+        if format is None:
+            format = "csv" if Path(path).suffix.lower() == ".csv" else "ndjson"
+
+        importer = TaskImporter(owner, batch_size=batch_size)
+        start = time.perf_counter()
+        if path == "-":
+            result = importer.run(read_rows(sys.stdin.buffer, format))
+        else:
+            try:
+                with open(path, "rb") as stream:
+                    result = importer.run(read_rows(stream, format))
+            except OSError as exc:
+                raise CommandError(str(exc))
+        elapsed = time.perf_counter() - start
+
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        rate = result["imported"] / elapsed if elapsed else 0
+        self.stdout.write(
+            f"Imported {result['imported']} tasks in {elapsed:.2f}s "
+            f"({rate:.0f} rows/sec), {result['failed']} rows failed"
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.9 on 2026-10-18 04:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', '-created_at', 'id'], name='task_user_created_id_idx'),
+        ),
+    ]
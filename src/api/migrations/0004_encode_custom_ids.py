@@ -0,0 +1,75 @@
+# Generated by Django 5.2.9 on 2026-10-18 04:59
+#
+# Data half of the CustomIDField bigint switch; 0005 alters the columns. They
+# are separate migrations because PostgreSQL refuses ALTER TABLE on tables with
+# pending deferred FK checks from the updates in the same transaction.
+
+from core.id_generator import format_id, generate_custom_ids, parse_id
+from django.db import migrations
+
+ID_PREFIXES = (("Task", "TASK_"), ("Category", "CAT_"))
+
+
+def _links(apps, model_name):
+    """M2M through table and the column in it that points at model_name"""
+    field = apps.get_model("api", "Task")._meta.get_field("categories")
+    column = field.m2m_column_name() if model_name == "Task" else field.m2m_reverse_name()
+    return field.m2m_db_table(), column
+
+
+def _rewrite_ids(apps, schema_editor, convert):
+    quote = schema_editor.quote_name
+    with schema_editor.connection.cursor() as cursor:
+        for model_name, prefix in ID_PREFIXES:
+            table = apps.get_model("api", model_name)._meta.db_table
+            cursor.execute(f"SELECT {quote('id')} FROM {quote(table)}")
+            mapping = convert(prefix, [row[0] for row in cursor.fetchall()])
+
+            link_table, link_column = _links(apps, model_name)
+            for table_name, column in ((table, "id"), (link_table, link_column)):
+                cursor.executemany(
+                    f"UPDATE {quote(table_name)} SET {quote(column)} = %s "
+                    f"WHERE {quote(column)} = %s",
+                    [(new, old) for old, new in mapping.items()],
+                )
+
+
+def _to_integers(prefix, ids):
+    mapping, legacy = {}, []
+    for custom_id in ids:
+        try:
+            mapping[custom_id] = str(parse_id(prefix, custom_id))
+        except ValueError:
+            legacy.append(custom_id)
+    # IDs from the old timestamp/hash generator do not fit in 64 bits
+    for custom_id, new_id in zip(legacy, generate_custom_ids(prefix, len(legacy))):
+        mapping[custom_id] = str(parse_id(prefix, new_id))
+    return mapping
+
+
+def _to_prefixed(prefix, ids):
+    return {str(value): format_id(prefix, int(value)) for value in ids}
+
+
+def encode_ids_as_integers(apps, schema_editor):
+    """
+    Store every Task/Category id, and the M2M links to them, as the decimal
+    string of the integer it encodes, so the AlterFields in 0005 can cast the
+    columns with a plain ``USING id::bigint``.
+    """
+    _rewrite_ids(apps, schema_editor, _to_integers)
+
+
+def decode_integer_ids(apps, schema_editor):
+    _rewrite_ids(apps, schema_editor, _to_prefixed)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_task_notified_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(encode_ids_as_integers, decode_integer_ids),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.9 on 2026-10-18 04:59
+
+import api.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_encode_custom_ids'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='id',
+            field=api.models.CustomIDField(max_length=50, prefix='CAT', primary_key=True, serialize=False, storage='bigint', unique=True),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='id',
+            field=api.models.CustomIDField(max_length=50, prefix='TASK', primary_key=True, serialize=False, storage='bigint', unique=True),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Expression index behind TaskSearchFilter; it must use the same expression as
+# api.filters.task_search_vector() for the planner to pick it up. Full-text
+# search only exists on PostgreSQL, other databases fall back to icontains.
+SEARCH_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS task_search_idx ON api_task USING GIN ("
+    "to_tsvector('simple'::regconfig, "
+    "COALESCE(title, '') || ' ' || COALESCE(description, ''))"
+    ")"
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(SEARCH_INDEX_SQL)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS task_search_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_compact_custom_ids'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'completed', '-created_at', 'id'], name='task_user_completed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date', 'id'], name='task_user_due_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'title', 'id'], name='task_user_title_id_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.9 on 2026-10-18 05:35
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_task_stats(apps, schema_editor):
+    Task = apps.get_model('api', 'Task')
+    UserTaskStats = apps.get_model('api', 'UserTaskStats')
+    rows = (
+        Task.objects.order_by()
+        .values('user_id')
+        .annotate(
+            open_count=Count('pk', filter=Q(completed=False)),
+            completed_count=Count('pk', filter=Q(completed=True)),
+            overdue_count=Count(
+                'pk', filter=Q(completed=False, notified_at__isnull=False)
+            ),
+        )
+    )
+    UserTaskStats.objects.bulk_create(
+        (UserTaskStats(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_task_list_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTaskStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('open_count', models.IntegerField(default=0)),
+                ('completed_count', models.IntegerField(default=0)),
+                ('overdue_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'User task stats',
+            },
+        ),
+        migrations.RunPython(fill_task_stats, migrations.RunPython.noop),
+    ]
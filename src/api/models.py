@@ -1,4 +1,10 @@
-from core.id_generator import generate_category_id, generate_task_id
+from core.id_generator import (
+    format_id,
+    generate_category_id,
+    generate_custom_id,
+    generate_task_id,
+    parse_id,
+)
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.db import models
@@ -8,14 +14,67 @@ class CustomIDField(models.CharField):
     """
     Custom field for generating unique IDs without using UUID, random,
     or standard postgres functions.
+
+    With ``storage="bigint"`` the value is still the prefixed string in Python
+    and in the API (e.g. ``TASK_0001A2B3C4D5E6F7``), but the database stores the
+    64-bit integer it encodes. That keeps the primary key, FK and M2M indexes
+    several times smaller than ``varchar(50)`` and makes comparisons cheaper.
     """
 
+    STORAGE_CHAR = "char"
+    STORAGE_BIGINT = "bigint"
+
     def __init__(self, prefix="", *args, **kwargs):
         self.prefix = prefix
+        self.storage = kwargs.pop("storage", self.STORAGE_CHAR)
         kwargs.setdefault("max_length", 50)
         kwargs.setdefault("unique", True)
         super().__init__(*args, **kwargs)
 
+    @property
+    def id_prefix(self):
+        return f"{self.prefix}_"
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.prefix:
+            kwargs["prefix"] = self.prefix
+        if self.storage != self.STORAGE_CHAR:
+            kwargs["storage"] = self.storage
+        return name, path, args, kwargs
+
+    def get_internal_type(self):
+        if self.storage == self.STORAGE_BIGINT:
+            return "BigIntegerField"
+        return super().get_internal_type()
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or self.storage != self.STORAGE_BIGINT:
+            return value
+        return format_id(self.id_prefix, int(value))
+
+    def to_python(self, value):
+        if self.storage == self.STORAGE_BIGINT and isinstance(value, int):
+            return format_id(self.id_prefix, value)
+        return super().to_python(value)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None or self.storage != self.STORAGE_BIGINT:
+            return value
+        try:
+            return parse_id(self.id_prefix, value)
+        except ValueError:
+            # Malformed or legacy IDs cannot be stored in this mode, so a
+            # lookup for one can never match a row
+            return -1
+
+    def get_db_prep_save(self, value, connection):
+        if value is not None and self.storage == self.STORAGE_BIGINT:
+            # Unlike lookups, writes must not silently accept a bad ID
+            parse_id(self.id_prefix, self.to_python(value))
+        return super().get_db_prep_save(value, connection)
+
     def pre_save(self, model_instance, add):
         if add and not getattr(model_instance, self.attname):
             if hasattr(self, "prefix"):
@@ -25,7 +84,7 @@ class CustomIDField(models.CharField):
                     value = generate_category_id()
                 else:
                     # Fallback for other prefixes
-                    value = generate_task_id()  # Or implement generic generator
+                    value = generate_custom_id(self.id_prefix)
             else:
                 # If no prefix is set, use task as default
                 value = generate_task_id()
@@ -36,7 +95,7 @@ class CustomIDField(models.CharField):
 
 
 class Category(models.Model):
-    id = CustomIDField(prefix="CAT", primary_key=True)
+    id = CustomIDField(prefix="CAT", primary_key=True, storage="bigint")
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -50,19 +109,108 @@ class Category(models.Model):
         ordering = ["name"]
 
 
+STATS_STATE_FIELDS = {"user_id", "completed", "notified_at"}
+
+
+class TaskQuerySet(models.QuerySet):
+    """
+    Shared queryset layer for Task so every view and Celery task loads the
+    related user and categories in a constant number of queries.
+    """
+
+    def for_user(self, user):
+        return self.filter(user=user)
+
+    def with_user(self):
+        return self.select_related("user")
+
+    def with_categories(self):
+        return self.prefetch_related("categories")
+
+    def with_related(self):
+        return self.with_user().with_categories()
+
+
 class Task(models.Model):
-    id = CustomIDField(prefix="TASK", primary_key=True)
+    id = CustomIDField(prefix="TASK", primary_key=True, storage="bigint")
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True, null=True)
     completed = models.BooleanField(default=False)
     due_date = models.DateTimeField(null=True, blank=True)
+    # Set once a due notification has been dispatched for the current due_date
+    notified_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)  # Date of creation as required
     updated_at = models.DateTimeField(auto_now=True)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="tasks")
     categories = models.ManyToManyField(Category, blank=True, related_name="tasks")
 
+    objects = TaskQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if STATS_STATE_FIELDS.issubset(field_names):
+            # Counted as loaded, so a save can adjust UserTaskStats by the
+            # difference (see api.stats)
+            instance._stats_state = instance.stats_state()
+        return instance
+
+    def stats_state(self):
+        """User and buckets this task counts in: (user_id, completed, overdue)"""
+        overdue = not self.completed and self.notified_at is not None
+        return self.user_id, self.completed, overdue
+
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Backs keyset pagination of a user's tasks by (-created_at, id)
+            models.Index(
+                fields=["user", "-created_at", "id"],
+                name="task_user_created_id_idx",
+            ),
+            # Back the ?completed=, ?due_after=/?due_before= and ?ordering=
+            # filters of the task list endpoints
+            models.Index(
+                fields=["user", "completed", "-created_at", "id"],
+                name="task_user_completed_idx",
+            ),
+            models.Index(
+                fields=["user", "due_date", "id"],
+                name="task_user_due_id_idx",
+            ),
+            models.Index(
+                fields=["user", "title", "id"],
+                name="task_user_title_id_idx",
+            ),
+            # Lets check_due_tasks touch only open, not yet notified tasks
+            models.Index(
+                fields=["due_date"],
+                condition=models.Q(completed=False, notified_at__isnull=True),
+                name="task_due_unnotified_idx",
+            ),
+        ]
+
+
+class UserTaskStats(models.Model):
+    """
+    Task counters of one user, kept up to date on every task write (see
+    api.stats) and reconciled periodically, so reading them is a single row
+    lookup. Overdue tasks are open tasks whose due notification was sent.
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="task_stats"
+    )
+    open_count = models.IntegerField(default=0)
+    completed_count = models.IntegerField(default=0)
+    overdue_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "User task stats"
+
+    def __str__(self):
+        return f"Task stats of {self.user_id}"
@@ -0,0 +1,210 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a two-column ordering: a sort field plus the
+    primary key as a tiebreaker.
+
+    Unlike OFFSET pagination, every page is fetched with a single
+    ``WHERE (field, id) > (...) ORDER BY field, id LIMIT n`` query, so deep pages
+    cost the same as the first one as long as an index on the ordering exists.
+    Cursor tokens are opaque base64 strings.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = settings.API_PAGE_SIZE
+    max_page_size = 500
+    invalid_cursor_message = "Invalid cursor"
+
+    # Default ordering matches Task.Meta.ordering with the CustomIDField pk as
+    # tiebreaker. Views can override it with a ``pagination_ordering`` attribute,
+    # and an explicit order_by() on the queryset (e.g. from TaskOrderingFilter)
+    # takes precedence over both.
+    ordering = ("-created_at", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self._page_queryset(queryset, request, view)
+        return self._set_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset() for async views, fetching with the async ORM"""
+        queryset = self._page_queryset(queryset, request, view)
+        return self._set_page([obj async for obj in queryset])
+
+    def _page_queryset(self, queryset, request, view):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.field, self.tiebreaker = self.get_ordering(request, queryset, view)
+        self.nullable = queryset.model._meta.get_field(self.field.lstrip("-")).null
+        self.base_url = request.build_absolute_uri()
+
+        self.cursor = self.decode_cursor(request, queryset.model)
+        self.reverse = self.cursor is not None and self.cursor["reverse"]
+
+        queryset = queryset.order_by(*self._order_by(self.reverse))
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self._seek_filter(self.cursor["value"], self.cursor["id"], self.reverse)
+            )
+
+        # Fetch one extra row to learn whether there is a following page
+        return queryset[: self.page_size + 1]
+
+    def _set_page(self, results):
+        has_following = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                page_size = int(request.query_params[self.page_size_query_param])
+                if page_size > 0:
+                    return min(page_size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        explicit = [term for term in queryset.query.order_by if isinstance(term, str)]
+        if explicit:
+            return explicit[0], self.ordering[1]
+        return getattr(view, "pagination_ordering", self.ordering)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Ran off the end of the list, so there is no row to seek back
+            # from; start over at the first page
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        name = self.field.lstrip("-")
+        # Pages are model instances or .values() rows
+        if isinstance(instance, dict):
+            value, pk = instance[name], instance[self.tiebreaker]
+        else:
+            value, pk = getattr(instance, name), getattr(instance, self.tiebreaker)
+        payload = {
+            "v": value.isoformat() if hasattr(value, "isoformat") else value,
+            "i": pk,
+            "r": int(reverse),
+        }
+        token = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+            field = model._meta.get_field(self.field.lstrip("-"))
+            return {
+                "value": field.to_python(payload["v"]),
+                "id": str(payload["i"]),
+                "reverse": bool(payload.get("r", 0)),
+            }
+        except (
+            TypeError,
+            ValueError,
+            KeyError,
+            UnicodeError,
+            binascii.Error,
+            ValidationError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _order_by(self, reverse):
+        descending = self.field.startswith("-") != reverse
+        name = self.field.lstrip("-")
+        if self.nullable:
+            # NULL sorts as the largest value, as in PostgreSQL B-tree indexes
+            field_order = (
+                F(name).desc(nulls_first=True)
+                if descending
+                else F(name).asc(nulls_last=True)
+            )
+        else:
+            field_order = f"-{name}" if descending else name
+        tiebreaker_order = f"-{self.tiebreaker}" if reverse else self.tiebreaker
+        return field_order, tiebreaker_order
+
+    def _seek_filter(self, value, pk, reverse):
+        """Rows strictly after (value, pk) in the effective ordering."""
+        descending = self.field.startswith("-") != reverse
+        name = self.field.lstrip("-")
+        pk_after = Q(**{f"{self.tiebreaker}__{'lt' if reverse else 'gt'}": pk})
+        is_null = Q(**{f"{name}__isnull": True})
+
+        if value is None:
+            after = is_null & pk_after
+            if descending:
+                # Descending, NULLs come first and every value follows them
+                after |= ~is_null
+            return after
+
+        field_lookup = "lt" if descending else "gt"
+        after = Q(**{f"{name}__{field_lookup}": value}) | (
+            Q(**{name: value}) & pk_after
+        )
+        # Redundant with the above, but a plain range the index can start the
+        # scan at; the OR alone only narrows the index by its leading columns
+        bound = Q(**{f"{name}__{'lte' if descending else 'gte'}": value})
+        if self.nullable and not descending:
+            # Ascending, NULLs come last and follow every value
+            after |= is_null
+            bound |= is_null
+        return bound & after
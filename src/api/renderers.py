@@ -0,0 +1,86 @@
+"""
+orjson-backed JSON renderer and parser, the API defaults.
+
+Both are drop-in replacements for DRF's JSONRenderer and JSONParser: output
+and parse results are the same (compact, non-ASCII kept, U+2028/U+2029
+escaped, datetimes and lazy strings converted by DRF's encoder), several
+times faster. They fall back to the stdlib implementation when orjson is not
+installed, ``API_ORJSON`` is off, and for what orjson does not cover:
+pretty-printed or ASCII-only output, integers beyond 64 bits, dicts with
+non-string keys and request bodies that are not UTF-8.
+
+Floats are the exception; the API itself renders none. orjson may write
+them differently (``1e-7`` for ``1e-07``) and renders NaN and infinity as
+null where the strict stdlib encoder raises.
+"""
+
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_encoder = JSONEncoder()
+
+# orjson reads integers beyond 64 bits as floats
+_BIG_INTEGER = re.compile(rb"\d{20}")
+
+if orjson is not None:
+    # Datetimes and dataclasses go through DRF's encoder, as with json
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def orjson_enabled():
+    return orjson is not None and settings.API_ORJSON
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            data is None
+            or not orjson_enabled()
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # The stdlib encoder renders big integers and non-string keys
+            # (orjson's option for those slows down every call) and reports
+            # the rest
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped like JSONRenderer does, so the output is valid JavaScript.
+        # Both start with \xe2, which a single memchr rules out
+        if ret.find(b"\xe2") != -1:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028")
+            ret = ret.replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not orjson_enabled() or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if not _BIG_INTEGER.search(body):
+            try:
+                return orjson.loads(body)
+            except orjson.JSONDecodeError:
+                # Reported with the usual message (or, for non-strict
+                # constants, parsed) by the stdlib parser
+                pass
+        return super().parse(io.BytesIO(body), media_type, parser_context)
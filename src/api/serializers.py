@@ -1,10 +1,20 @@
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
-from .models import Category, Task
+from .models import Category, Task, UserTaskStats
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class SparseFieldsetSerializerMixin:
+    """Renders only the given ``fields`` (see api.fieldsets), all by default"""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields).difference(fields):
+                self.fields.pop(name)
+
+
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Category
         fields = "__all__"
@@ -16,7 +26,7 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "email", "first_name", "last_name"]
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     category_ids = serializers.ListField(
         write_only=True, child=serializers.CharField(), required=False
@@ -25,7 +35,7 @@ class TaskSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = "__all__"
-        read_only_fields = ["id", "user"]
+        read_only_fields = ["id", "user", "notified_at"]
 
     def create(self, validated_data, **kwargs):
         print(f"validated_data: {validated_data}")
@@ -42,12 +52,33 @@ class TaskSerializer(serializers.ModelSerializer):
 
         return task
 
+    @staticmethod
+    def assign_fields(instance, validated_data):
+        """
+        Copy validated fields (except category_ids) onto an unsaved instance.
+        Returns the names of the assigned model fields.
+        """
+        fields = []
+
+        # A new due date deserves a new notification
+        if (
+            "due_date" in validated_data
+            and validated_data["due_date"] != instance.due_date
+        ):
+            instance.notified_at = None
+            fields.append("notified_at")
+
+        for attr, value in validated_data.items():
+            if attr != "category_ids":
+                setattr(instance, attr, value)
+                fields.append(attr)
+        return fields
+
     def update(self, instance, validated_data):
         category_ids = validated_data.pop("category_ids", None)
 
         # Update all other fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
+        self.assign_fields(instance, validated_data)
         instance.save()
 
         # Update categories if provided
@@ -56,3 +87,34 @@ class TaskSerializer(serializers.ModelSerializer):
             instance.categories.set(categories)
 
         return instance
+
+
+class TaskBulkSerializer(serializers.Serializer):
+    """Envelope of a /tasks/bulk/ request; items are validated by TaskBulkWriter"""
+
+    max_items = 5000
+
+    create = serializers.ListField(
+        child=serializers.DictField(), required=False, max_length=max_items
+    )
+    update = serializers.ListField(
+        child=serializers.DictField(), required=False, max_length=max_items
+    )
+    delete = serializers.ListField(
+        child=serializers.CharField(), required=False, max_length=max_items
+    )
+
+
+class UserTaskStatsSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source="user.username", read_only=True)
+    open = serializers.IntegerField(source="open_count", read_only=True)
+    completed = serializers.IntegerField(source="completed_count", read_only=True)
+    overdue = serializers.IntegerField(source="overdue_count", read_only=True)
+    total = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UserTaskStats
+        fields = ["username", "open", "completed", "overdue", "total", "updated_at"]
+
+    def get_total(self, stats):
+        return stats.open_count + stats.completed_count
@@ -0,0 +1,68 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_categories, invalidate_user_tasks
+from .fallback_user import invalidate_fallback_user
+from .models import Category, Task
+from .stats import record_task_changes
+
+
+def _invalidate_now_and_on_commit():
+    # Drop the cached value right away and once more after commit, so a
+    # concurrent request cannot re-cache the pre-commit state for good.
+    invalidate_fallback_user()
+    transaction.on_commit(invalidate_fallback_user)
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, **kwargs):
+    if created:
+        _invalidate_now_and_on_commit()
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    _invalidate_now_and_on_commit()
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    invalidate_user_tasks(instance.user_id)
+
+
+@receiver(post_save, sender=Task)
+def task_saved_stats(sender, instance, created, **kwargs):
+    new = instance.stats_state()
+    old = None if created else getattr(instance, "_stats_state", None)
+    # An update of a task that was not loaded from the database has no known
+    # previous state; reconciliation catches up with it
+    if created or old is not None:
+        record_task_changes([(old, new)])
+    instance._stats_state = new
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted_stats(sender, instance, **kwargs):
+    old = getattr(instance, "_stats_state", None) or instance.stats_state()
+    record_task_changes([(old, None)])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    # Categories are nested in every task payload
+    invalidate_categories()
+
+
+@receiver(m2m_changed, sender=Task.categories.through)
+def task_categories_changed(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if reverse:
+        # category.tasks.add(...) and friends may touch many users' tasks
+        invalidate_categories()
+    else:
+        invalidate_user_tasks(instance.user_id)
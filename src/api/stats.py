@@ -0,0 +1,109 @@
+"""
+Per-user task counters behind /api/users/<username>/stats/.
+
+Every task write adjusts the UserTaskStats row of its user by the difference
+between the task's counted state before and after (``Task.stats_state()``):
+model saves and deletes through ``api.signals``, bulk writes and the due task
+scan explicitly. A missing row is computed from the tasks on first read.
+
+Deltas are exact as long as every write goes through these paths; writes
+that do not (``QuerySet.update()``, raw SQL) and races with the initial count
+are fixed by ``recount_task_stats``, which Celery beat runs periodically
+(``api.tasks.reconcile_task_stats``).
+"""
+
+from collections import defaultdict
+
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Task, UserTaskStats
+
+STATS_FIELDS = ("open_count", "completed_count", "overdue_count")
+
+STATS_AGGREGATES = {
+    "open_count": Count("pk", filter=Q(completed=False)),
+    "completed_count": Count("pk", filter=Q(completed=True)),
+    "overdue_count": Count("pk", filter=Q(completed=False, notified_at__isnull=False)),
+}
+
+
+def _counts(state):
+    _, completed, overdue = state
+    return (int(not completed), int(completed), int(overdue))
+
+
+def record_task_changes(changes):
+    """
+    Apply ``(old_state, new_state)`` pairs of task writes to the counters;
+    None stands for a task that did not exist before or does not after.
+    """
+    deltas = defaultdict(lambda: [0] * len(STATS_FIELDS))
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is not None:
+                delta = deltas[state[0]]
+                for i, count in enumerate(_counts(state)):
+                    delta[i] += sign * count
+
+    now = timezone.now()
+    for user_id, delta in deltas.items():
+        if any(delta):
+            # Rows that do not exist yet are counted from scratch when read
+            UserTaskStats.objects.filter(user_id=user_id).update(
+                updated_at=now,
+                **{
+                    field: F(field) + value
+                    for field, value in zip(STATS_FIELDS, delta)
+                    if value
+                },
+            )
+
+
+def count_task_stats(user_id):
+    return Task.objects.filter(user_id=user_id).aggregate(**STATS_AGGREGATES)
+
+
+def get_task_stats(user):
+    """Counters of ``user``, created from the tasks if missing"""
+    stats = UserTaskStats.objects.filter(user=user).first()
+    if stats is None:
+        stats, _ = UserTaskStats.objects.update_or_create(
+            user=user, defaults=count_task_stats(user.pk)
+        )
+    stats.user = user
+    return stats
+
+
+def recount_task_stats():
+    """
+    Recount the tasks of every user and fix the rows that drifted or are
+    missing. Returns the number of rows written.
+    """
+    counts = {
+        row.pop("user_id"): row
+        for row in Task.objects.order_by()
+        .values("user_id")
+        .annotate(**STATS_AGGREGATES)
+        .iterator()
+    }
+    zero = dict.fromkeys(STATS_FIELDS, 0)
+
+    drifted = []
+    for stats in UserTaskStats.objects.iterator():
+        expected = counts.pop(stats.user_id, zero)
+        if any(getattr(stats, field) != expected[field] for field in STATS_FIELDS):
+            for field in STATS_FIELDS:
+                setattr(stats, field, expected[field])
+            stats.updated_at = timezone.now()
+            drifted.append(stats)
+    UserTaskStats.objects.bulk_update(
+        drifted, [*STATS_FIELDS, "updated_at"], batch_size=1000
+    )
+    # Users with tasks but no row yet
+    UserTaskStats.objects.bulk_create(
+        [UserTaskStats(user_id=user_id, **row) for user_id, row in counts.items()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(drifted) + len(counts)
@@ -1,28 +1,126 @@
 import logging
+from itertools import islice
 
 from celery import shared_task
+from core.db_router import replica_db
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS
 from django.utils import timezone
 
+from .cache import invalidate_user_tasks
 from .models import Task
+from .stats import record_task_changes, recount_task_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _batched(iterable, size):
+    """Yield lists of at most ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _notification_payload(row):
+    """Everything a worker needs to notify about a task, without a DB lookup."""
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "user_id": row["user_id"],
+        "username": row["user__username"],
+        "due_date": row["due_date"].isoformat() if row["due_date"] else None,
+    }
+
+
+def _still_due(batch):
+    """Tasks of a batch the primary still sees as due and not notified"""
+    # The replica may lag behind the notified_at stamps of the previous tick
+    due = set(
+        Task.objects.filter(
+            id__in=[task["id"] for task in batch], completed=False, notified_at=None
+        ).values_list("id", flat=True)
+    )
+    return [task for task in batch if task["id"] in due]
 
 
 @shared_task
 def check_due_tasks():
     """
     Check for tasks that are due and send notifications
+
+    Due tasks are streamed from the database and dispatched in batches of
+    TASK_NOTIFICATION_BATCH_SIZE, one Celery message per batch. Dispatched
+    tasks are stamped with notified_at, so each tick only picks up tasks that
+    became due since the previous one.
     """
     now = timezone.now()
-    due_tasks = Task.objects.filter(due_date__lte=now, completed=False)
+    batch_size = settings.TASK_NOTIFICATION_BATCH_SIZE
+    scan_db = replica_db()
+    due_tasks = (
+        Task.objects.using(scan_db)
+        .filter(due_date__lte=now, completed=False, notified_at=None)
+        .order_by()
+        .values("id", "title", "due_date", "user_id", "user__username")
+        .iterator(chunk_size=batch_size)
+    )
+
+    checked = batches = 0
+    for batch in _batched(map(_notification_payload, due_tasks), batch_size):
+        if scan_db != DEFAULT_DB_ALIAS:
+            batch = _still_due(batch)
+            if not batch:
+                continue
+        send_task_notifications.delay(batch)
+        ids = [task["id"] for task in batch]
+        # Tasks completed or notified since the scan are left alone
+        stamped = Task.objects.filter(
+            id__in=ids, completed=False, notified_at=None
+        ).update(notified_at=now)
+        if stamped < len(batch):
+            stamped_ids = set(
+                Task.objects.filter(id__in=ids, notified_at=now).values_list(
+                    "id", flat=True
+                )
+            )
+            batch = [task for task in batch if task["id"] in stamped_ids]
+        # Open tasks with a sent notification count as overdue
+        record_task_changes(
+            ((task["user_id"], False, False), (task["user_id"], False, True))
+            for task in batch
+        )
+        # notified_at is part of the cached task payloads
+        for user_id in {task["user_id"] for task in batch}:
+            invalidate_user_tasks(user_id)
+        checked += len(batch)
+        batches += 1
+
+    return f"Checked {checked} due tasks in {batches} batches"
+
 
-    for task in due_tasks:
-        logger.info(f"Task '{task.title}' is due for user {task.user.username}")
-        # Send notification logic would go here
-        # This could involve calling a notification service
-        # or queuing a message to be sent via Telegram, email, etc.
-        send_task_notification.delay(task.id)
+@shared_task
+def reconcile_task_stats():
+    """
+    Recount the task counters of every user (UserTaskStats), fixing drift
+    from writes that bypassed the incremental updates
+    """
+    fixed = recount_task_stats()
+    return f"Reconciled task stats, fixed {fixed} users"
+
+
+@shared_task
+def send_task_notifications(tasks):
+    """
+    Send notifications for a batch of tasks prepared by check_due_tasks
+    """
+    for task in tasks:
+        # In a real implementation, this would send actual notifications
+        # via Telegram, email, etc. For now, we'll log the notification
+        logger.info(
+            f"Notification sent for task '{task['title']}' to user {task['username']}"
+        )
 
-    return f"Checked {len(due_tasks)} due tasks"
+    return f"Notifications sent for {len(tasks)} tasks"
 
 
 @shared_task
@@ -31,14 +129,12 @@ def send_task_notification(task_id):
     Send notification for a specific task
     """
     try:
-        task = Task.objects.get(id=task_id)
+        task = Task.objects.with_user().get(id=task_id)
         # In a real implementation, this would send actual notifications
         # For now, we'll log the notification
         logger.info(
             f"Notification sent for task '{task.title}' to user {task.user.username}"
         )
-        # For now, we'll log the notification
-        logger.info(f"Notification sent for task '{task.title}' to user {task.user.username}")
 
         # Future enhancement: Send actual notification via Telegram, email, etc.
         return f"Notification sent for task {task.id}"
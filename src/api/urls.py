@@ -1,16 +1,32 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
+
+if settings.API_ASYNC_VIEWS:
+    task_list_view = async_views.task_list
+    telegram_user_tasks_view = async_views.telegram_user_tasks
+else:
+    task_list_view = views.TaskListCreateView.as_view()
+    telegram_user_tasks_view = views.get_user_by_telegram_id
 
 urlpatterns = [
     # Task URLs
-    path("tasks/", views.TaskListCreateView.as_view(), name="task-list-create"),
+    path("tasks/", task_list_view, name="task-list-create"),
+    path("tasks/bulk/", views.TaskBulkView.as_view(), name="task-bulk"),
+    path("tasks/export/", views.TaskExportView.as_view(), name="task-export"),
+    path("tasks/import/", views.TaskImportView.as_view(), name="task-import"),
     path("tasks/<str:id>/", views.TaskDetailView.as_view(), name="task-detail"),
     path(
         "users/<str:username>/tasks/",
         views.UserTaskListView.as_view(),
         name="user-task-list",
     ),
+    path(
+        "users/<str:username>/stats/",
+        views.UserTaskStatsView.as_view(),
+        name="user-task-stats",
+    ),
     # Category URLs
     path(
         "categories/",
@@ -25,7 +41,7 @@ urlpatterns = [
     # Telegram bot integration
     path(
         "telegram/user/<int:telegram_id>/tasks/",
-        views.get_user_by_telegram_id,
+        telegram_user_tasks_view,
         name="telegram-user-tasks",
     ),
 ]
@@ -1,32 +1,110 @@
 import logging
 
+from core.db_router import current_read_db
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils.functional import cached_property
 from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 
-from .models import Category, Task
-from .serializers import CategorySerializer, TaskSerializer
+from .bulk import TaskBulkWriter
+from .cache import (
+    CachedConditionalGetMixin,
+    cached_conditional_get,
+    task_cache_version_keys,
+)
+from .conditional import ConditionalGetMixin, make_etag, queryset_version
+from .export import EXPORT_FORMATS, CSVRenderer, NDJSONRenderer, aiter_rows
+from .fallback_user import get_fallback_user
+from .fast_serializers import serialize_task_rows, task_values
+from .fieldsets import SparseFieldsetMixin, load_fields, requested_fields
+from .filters import TASK_FILTER_BACKENDS, filter_tasks
+from .importer import TaskImporter, read_rows
+from .models import Category, Task, UserTaskStats
+from .pagination import KeysetPagination
+from .permissions import TaskBulkPermission
+from .serializers import (
+    CategorySerializer,
+    TaskBulkSerializer,
+    TaskSerializer,
+    UserTaskStatsSerializer,
+)
+from .stats import get_task_stats
 
 logger = logging.getLogger(__name__)
 
 
-class TaskListCreateView(generics.ListCreateAPIView):
-    queryset = Task.objects.all()
-    serializer_class = TaskSerializer
-    permission_classes = [AllowAny]
+def get_task_owner(request):
+    """User that new tasks are created for"""
+    if request.user.is_authenticated:
+        return request.user
+    # For demo purposes, use or create the first user
+    user = get_fallback_user()
+    if not user:
+        # Another process may create it at the same time
+        user, created = User.objects.get_or_create(username="demo")
+        if created:
+            user.set_password("demo")
+            user.save(update_fields=["password"])
+    return user
+
+
+def get_tasks_user(request):
+    """User whose tasks a read request sees"""
+    if request.user.is_authenticated:
+        return request.user
+    # For demo purposes, anonymous requests see the first user's tasks
+    return get_fallback_user()
+
+
+class TaskListMixin(SparseFieldsetMixin, CachedConditionalGetMixin):
+    """Cached, conditional list of the tasks a request sees"""
+
+    conditional_related = ("categories",)
+    pagination_class = KeysetPagination
+
+    @cached_property
+    def tasks_user(self):
+        return get_tasks_user(self.request)
 
     def get_queryset(self):
         # Filter tasks by the current user
-        if self.request.user.is_authenticated:
-            return Task.objects.filter(user=self.request.user)
-        else:
-            # For demo purposes, return tasks for the first user
-            user = User.objects.first()
-            if user:
-                return Task.objects.filter(user=user)
-            return Task.objects.none()
+        if self.tasks_user:
+            return Task.objects.for_user(self.tasks_user).with_related()
+        return Task.objects.none()
+
+    def get_cache_version_keys(self):
+        return task_cache_version_keys(self.tasks_user)
+
+    def list(self, request, *args, **kwargs):
+        if not settings.API_FAST_TASK_READS:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+
+        fields = self.sparse_fields
+
+        def render():
+            rows = task_values(queryset, fields)
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(
+                    serialize_task_rows(page, using=queryset.db, fields=fields)
+                )
+            return Response(serialize_task_rows(rows, using=queryset.db, fields=fields))
+
+        return self.conditional_response(request, queryset, render)
+
+
+class TaskListCreateView(TaskListMixin, generics.ListCreateAPIView):
+    queryset = Task.objects.with_related()
+    serializer_class = TaskSerializer
+    permission_classes = [AllowAny]
+    filter_backends = TASK_FILTER_BACKENDS
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -40,59 +118,142 @@ class TaskListCreateView(generics.ListCreateAPIView):
         )
 
     def perform_create(self, serializer):
-        if self.request.user.is_authenticated:
-            serializer.save(user=self.request.user)
-        else:
-            # For demo purposes, use or create the first user
-            user = User.objects.first()
-            if not user:
-                user = User.objects.create_user(username="demo", password="demo")
-            serializer.save(user=user)
+        serializer.save(user=get_task_owner(self.request))
+
+
+class TaskBulkView(generics.GenericAPIView):
+    """
+    Create, partially update and delete many tasks in one request:
+    {"create": [{...}], "update": [{"id": ..., ...}], "delete": [id, ...]}
+    """
+
+    serializer_class = TaskBulkSerializer
+    permission_classes = [TaskBulkPermission]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        writer = TaskBulkWriter(get_task_owner(request))
+        if not writer.validate(**serializer.validated_data):
+            logger.error(f"Bulk task errors: {writer.errors}")
+            return Response(
+                {"errors": writer.errors}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(writer.save(), status=status.HTTP_200_OK)
+
+
+class TaskExportView(generics.GenericAPIView):
+    """
+    All tasks a request sees, streamed as NDJSON (default) or CSV
+    (``?format=csv`` or ``Accept: text/csv``). The list filters apply.
+    """
+
+    permission_classes = [AllowAny]
+    filter_backends = TASK_FILTER_BACKENDS
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    chunk_size = 2000
+
+    def get_queryset(self):
+        user = get_tasks_user(self.request)
+        if user:
+            return Task.objects.for_user(user)
+        return Task.objects.none()
+
+    def get(self, request, *args, **kwargs):
+        # Rows are read after the view returned, outside of the routing
+        # block of the request, so pin the database now
+        queryset = self.filter_queryset(self.get_queryset()).using(current_read_db())
+        rows, filename = EXPORT_FORMATS[request.accepted_renderer.format]
+        content = rows(queryset, self.chunk_size)
+        if isinstance(request._request, ASGIRequest):
+            content = aiter_rows(content)
+        response = StreamingHttpResponse(
+            content, content_type=request.accepted_media_type
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class TaskImportView(generics.GenericAPIView):
+    """
+    Create tasks from an NDJSON (default) or CSV (Content-Type: text/csv)
+    request body in the format of the export. The body is read as a stream;
+    invalid rows are skipped and reported by line.
+    """
+
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        format = "csv" if request.content_type.startswith("text/csv") else "ndjson"
+        importer = TaskImporter(get_task_owner(request))
+        # Reading the raw stream keeps DRF from parsing the whole body
+        result = importer.run(read_rows(request.stream or (), format))
+        if result["failed"] and not result["imported"]:
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result, status=status.HTTP_200_OK)
 
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Task.objects.all()
+class TaskDetailView(
+    SparseFieldsetMixin, ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    queryset = Task.objects.with_related()
     serializer_class = TaskSerializer
     lookup_field = "id"
+    conditional_related = ("categories",)
 
     def get_queryset(self):
         # Ensure users can only access their own tasks
         if self.request.user.is_authenticated:
-            return Task.objects.filter(user=self.request.user)
+            return Task.objects.for_user(self.request.user).with_related()
         else:
             # For demo purposes, return tasks for the first user
-            user = User.objects.first()
+            user = get_fallback_user()
             if user:
-                return Task.objects.filter(user=user)
+                return Task.objects.for_user(user).with_related()
             return Task.objects.none()
 
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+class CategoryListCreateView(
+    SparseFieldsetMixin, CachedConditionalGetMixin, generics.ListCreateAPIView
+):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryDetailView(
+    SparseFieldsetMixin,
+    CachedConditionalGetMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = "id"
 
 
-class UserTaskListView(generics.ListAPIView):
+class UserTaskListView(TaskListMixin, generics.ListAPIView):
     serializer_class = TaskSerializer
+    filter_backends = TASK_FILTER_BACKENDS
 
-    def get_queryset(self):
-        # Get tasks for the currently authenticated user
-        if self.request.user.is_authenticated:
-            return Task.objects.filter(user=self.request.user)
-        else:
-            # For demo purposes, return tasks for the first user
-            user = User.objects.first()
-            if user:
-                return Task.objects.filter(user=user)
-            return Task.objects.none()
 
+class UserTaskStatsView(generics.RetrieveAPIView):
+    """Open, completed and overdue task counts of a user, read from one row"""
+
+    queryset = UserTaskStats.objects.all()
+    serializer_class = UserTaskStatsSerializer
+
+    def get_object(self):
+        # Only the counters of the user whose tasks the request sees
+        user = get_tasks_user(self.request)
+        if user is None or user.username != self.kwargs["username"]:
+            raise NotFound()
+        stats = get_task_stats(user)
+        self.check_object_permissions(self.request, stats)
+        return stats
 
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
 def get_user_by_telegram_id(request, telegram_id):
     """
     Helper endpoint for the bot to get user tasks by telegram ID
@@ -100,9 +261,29 @@ def get_user_by_telegram_id(request, telegram_id):
     """
     # For demo purposes, return tasks for the first user
     # In real implementation, you'd store telegram IDs with Django users
-    user = User.objects.first()  # Default to first user for demo
-    if user:
-        tasks = Task.objects.filter(user=user)
-        serializer = TaskSerializer(tasks, many=True)
-        return JsonResponse(serializer.data, safe=False)
-    return JsonResponse([], safe=False)
+    user = get_fallback_user()  # Default to first user for demo
+    tasks = Task.objects.for_user(user).with_related() if user else Task.objects.none()
+    tasks = filter_tasks(request, tasks)
+    fields = requested_fields(request, TaskSerializer)
+    tasks = load_fields(tasks, fields)
+
+    def render():
+        paginator = KeysetPagination()
+        if settings.API_FAST_TASK_READS:
+            page = paginator.paginate_queryset(task_values(tasks, fields), request)
+            return paginator.get_paginated_response(
+                serialize_task_rows(page, using=tasks.db, fields=fields)
+            )
+        page = paginator.paginate_queryset(tasks, request)
+        serializer = TaskSerializer(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data)
+
+    # Warm polls are served from the response cache, unchanged ones by the
+    # version counters alone
+    return cached_conditional_get(
+        request,
+        task_cache_version_keys(user),
+        lambda: (make_etag(request, queryset_version(tasks, ("categories",))), None),
+        render,
+        versioned=True,
+    )
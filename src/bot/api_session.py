@@ -0,0 +1,136 @@
+"""
+Long-lived HTTP session the bot uses to talk to the Django API.
+
+One aiohttp session per bot process keeps a pool of keep-alive connections,
+so an API call is a single round trip on a warm connection instead of a DNS
+lookup, TCP handshake and teardown per Telegram interaction.
+"""
+
+import asyncio
+import json
+import logging
+import random
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Safe to resend even if the first attempt may have reached the server
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {502, 503, 504}
+
+
+class APISession:
+    """
+    Shared aiohttp session with a bounded connection pool, timeouts and
+    retries with exponential backoff.
+
+    Idempotent requests are retried on connection errors, timeouts and
+    502/503/504 responses. Other requests (POST) are only retried when the
+    connection could not be established, i.e. nothing was sent.
+    """
+
+    def __init__(
+        self,
+        *,
+        timeout=10.0,
+        connect_timeout=3.0,
+        limit=100,
+        limit_per_host=20,
+        keepalive_timeout=30.0,
+        retries=2,
+        backoff=0.2,
+    ):
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._session = None
+
+    @property
+    def session(self):
+        # Created lazily, since aiohttp needs a running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout
+            )
+        return self._session
+
+    async def request(self, method, url, **kwargs):
+        """
+        Send a request and return ``(status, data)``, where ``data`` is the
+        decoded JSON body, or the text if the body is not JSON. Raises the
+        last aiohttp/timeout error once the retries are used up.
+        """
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        attempt = 0
+        while True:
+            try:
+                async with self.session.request(method, url, **kwargs) as resp:
+                    if (
+                        idempotent
+                        and resp.status in RETRY_STATUSES
+                        and attempt < self.retries
+                    ):
+                        raise _RetryableStatus(resp.status)
+                    return resp.status, await self._read(resp)
+            except (_RetryableStatus, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                retryable = idempotent or isinstance(exc, aiohttp.ClientConnectorError)
+                if not retryable or attempt >= self.retries:
+                    raise
+                attempt += 1
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(
+                    "%s %s failed (%s), retry %d/%d in %.2fs",
+                    method,
+                    url,
+                    exc,
+                    attempt,
+                    self.retries,
+                    delay,
+                )
+                # Jitter keeps retries of concurrent handlers from lining up
+                await asyncio.sleep(delay + random.uniform(0, self.backoff))
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @staticmethod
+    async def _read(resp):
+        text = await resp.text()
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
+
+
+class APIError(Exception):
+    """Unexpected response status from the API"""
+
+    def __init__(self, status, data=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.data = data
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
@@ -1,6 +1,5 @@
 import asyncio
 
-import aiohttp
 from aiogram import Bot, Dispatcher, F
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
@@ -10,7 +9,16 @@ from aiogram_dialog import Dialog, DialogManager, Window
 from aiogram_dialog.widgets.input import MessageInput
 from aiogram_dialog.widgets.kbd import Back, Button, Cancel, Column, Row, Select
 from aiogram_dialog.widgets.text import Const, Format
-from config import BOT_TOKEN, DJANGO_API_URL
+from api_session import APISession
+from config import (
+    API_CONNECT_TIMEOUT,
+    API_POOL_LIMIT_PER_HOST,
+    API_RETRIES,
+    API_TIMEOUT,
+    BOT_TASKS_PAGE_SIZE,
+    BOT_TOKEN,
+    DJANGO_API_URL,
+)
 
 
 # States for the dialog
@@ -22,44 +30,54 @@ class TaskStates(StatesGroup):
     viewing_tasks = State()
 
 
+# One pooled HTTP session per bot process, closed in main()
+api_session = APISession(
+    timeout=API_TIMEOUT,
+    connect_timeout=API_CONNECT_TIMEOUT,
+    limit_per_host=API_POOL_LIMIT_PER_HOST,
+    retries=API_RETRIES,
+)
+
+
 # API Client to communicate with Django
 class APIClient:
-    def __init__(self):
+    def __init__(self, session=api_session):
         self.base_url = DJANGO_API_URL
+        self.session = session
 
     async def get_user_tasks(self, user_id: int):
-        async with aiohttp.ClientSession() as session:
-            # In a real system, we'd have a way to authenticate users
-            # For now, we simulate getting tasks for a user
-            url = f"{self.base_url}/tasks/"
-            try:
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        # Filter for user's tasks (in real implementation would use token)
-                        return data
-                    else:
-                        return []
-            except Exception as e:
-                print(f"Error fetching tasks: {e}")
+        # In a real system, we'd have a way to authenticate users
+        # For now, we simulate getting tasks for a user
+        url = f"{self.base_url}/tasks/"
+        try:
+            # Only the first page fits into one message
+            status, data = await self.session.get(
+                url, params={"page_size": BOT_TASKS_PAGE_SIZE}
+            )
+            if status == 200:
+                # Filter for user's tasks (in real implementation would use token)
+                return data.get("results", [])
+            else:
                 return []
+        except Exception as e:
+            print(f"Error fetching tasks: {e}")
+            return []
 
     async def create_task(self, title: str, description: str, user_id: int):
-        async with aiohttp.ClientSession() as session:
-            url = f"{self.base_url}/tasks/"
-            payload = {
-                "title": title,
-                "user": user_id,  # In real implementation, this would be handled differently
-            }
-            try:
-                async with session.post(url, json=payload) as resp:
-                    if resp.status == 201:
-                        return await resp.json()
-                    else:
-                        return None
-            except Exception as e:
-                print(f"Error creating task: {e}")
+        url = f"{self.base_url}/tasks/"
+        payload = {
+            "title": title,
+            "user": user_id,  # In real implementation, this would be handled differently
+        }
+        try:
+            status, data = await self.session.post(url, json=payload)
+            if status == 201:
+                return data
+            else:
                 return None
+        except Exception as e:
+            print(f"Error creating task: {e}")
+            return None
 
 
 # Main menu window
@@ -135,23 +153,23 @@ async def add_task_handler(message: Message, dialog_manager: DialogManager):
     await dialog_manager.start(TaskStates.adding_title)
 
 
+def format_task(task):
+    lines = [f"• {task['title']} (Created: {task['created_at']})"]
+    if task.get("due_date"):
+        lines.append(f"  Due: {task['due_date']}")
+    if task.get("categories"):
+        cats = [cat["name"] for cat in task["categories"]]
+        lines.append(f"  Categories: {', '.join(cats)}")
+    return "\n".join(lines) + "\n"
+
+
 # Handler for /todo command
 async def view_tasks_handler(message: Message, dialog_manager: DialogManager):
     api_client = APIClient()
     tasks = await api_client.get_user_tasks(message.from_user.id)
 
-    tasks_text = ""
-    if tasks:
-        for task in tasks:
-            tasks_text += f"• {task['title']} (Created: {task['created_at']})\n"
-            if task.get("due_date"):
-                tasks_text += f"  Due: {task['due_date']}\n"
-            if task.get("categories"):
-                cats = [cat["name"] for cat in task["categories"]]
-                tasks_text += f"  Categories: {', '.join(cats)}\n"
-            tasks_text += "\n"
-    else:
-        tasks_text = "No tasks found."
+    # One join over per-task blocks instead of repeated concatenation
+    tasks_text = "\n".join(format_task(task) for task in tasks) or "No tasks found."
 
     # Update the dialog data with tasks
     dialog_manager.dialog_data["tasks"] = tasks_text
@@ -184,7 +202,11 @@ async def main():
     # Setup handlers
     setup_handlers(dp)
 
-    await dp.start_polling(bot)
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await api_session.close()
+        await bot.session.close()
 
 
 if __name__ == "__main__":
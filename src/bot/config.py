@@ -9,3 +9,42 @@ BOT_TOKEN = os.environ.get(
     "TELEGRAM_BOT_TOKEN", "8342568470:AAE3D3OkkIb3WnXbRK1XHFWr7hruk3MhXSs"
 )
 DJANGO_API_URL = os.environ.get("DJANGO_API_URL", "http://localhost:8000/api")
+
+# Connection pool, timeouts (seconds) and retries of the bot's API session
+API_TIMEOUT = float(os.environ.get("API_TIMEOUT", "10"))
+API_CONNECT_TIMEOUT = float(os.environ.get("API_CONNECT_TIMEOUT", "3"))
+API_POOL_LIMIT_PER_HOST = int(os.environ.get("API_POOL_LIMIT_PER_HOST", "20"))
+API_RETRIES = int(os.environ.get("API_RETRIES", "2"))
+
+# Per-user task list cache of the bot: lifetime in seconds and maximum users
+BOT_TASK_CACHE_TTL = float(os.environ.get("BOT_TASK_CACHE_TTL", "30"))
+BOT_TASK_CACHE_SIZE = int(os.environ.get("BOT_TASK_CACHE_SIZE", "10000"))
+# Tasks per page of the bot's task list; keeps messages far below Telegram's
+# 4096 character limit (titles are at most 200 characters)
+BOT_TASKS_PAGE_SIZE = int(os.environ.get("BOT_TASKS_PAGE_SIZE", "10"))
+
+# "polling" (default) or "webhook". In webhook mode the bot serves
+# WEBHOOK_PATH on WEBHOOK_HOST:WEBHOOK_PORT and, if WEBHOOK_BASE_URL (the
+# public URL) is set, registers it with Telegram on startup.
+BOT_MODE = os.environ.get("BOT_MODE", "polling")
+WEBHOOK_BASE_URL = os.environ.get("WEBHOOK_BASE_URL", "")
+WEBHOOK_PATH = os.environ.get("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET") or None
+WEBHOOK_HOST = os.environ.get("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", "8081"))
+# Update handlers running at once, and updates allowed to wait for them
+BOT_MAX_CONCURRENT_UPDATES = int(os.environ.get("BOT_MAX_CONCURRENT_UPDATES", "32"))
+BOT_MAX_PENDING_UPDATES = int(os.environ.get("BOT_MAX_PENDING_UPDATES", "1000"))
+
+# Base URL of the Bot API server; point it at a local or fake server for tests
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "")
+
+# FSM and dialog state storage. Redis (database 2 of REDIS_URL unless
+# FSM_REDIS_URL is given) lets bot replicas share dialogs and survive restarts;
+# without either the state stays in process memory. Idle dialogs expire after
+# the TTLs (seconds).
+FSM_REDIS_URL = os.environ.get("FSM_REDIS_URL") or (
+    os.environ["REDIS_URL"].rstrip("/") + "/2" if os.environ.get("REDIS_URL") else ""
+)
+FSM_STATE_TTL = int(os.environ.get("FSM_STATE_TTL", str(7 * 24 * 3600)))
+FSM_DATA_TTL = int(os.environ.get("FSM_DATA_TTL", str(7 * 24 * 3600)))
@@ -1,6 +1,6 @@
 import asyncio
+from urllib.parse import parse_qs, urlsplit
 
-import aiohttp
 from aiogram import F, Router
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
@@ -12,7 +12,18 @@ from aiogram_dialog.widgets.input import MessageInput
 from aiogram_dialog.widgets.kbd import Back, Button, Cancel, Column, Row, SwitchTo
 from aiogram_dialog.widgets.text import Const, Format
 
-from src.bot.config import DJANGO_API_URL
+from src.bot.api_session import APIError, APISession
+from src.bot.config import (
+    API_CONNECT_TIMEOUT,
+    API_POOL_LIMIT_PER_HOST,
+    API_RETRIES,
+    API_TIMEOUT,
+    BOT_TASK_CACHE_SIZE,
+    BOT_TASK_CACHE_TTL,
+    BOT_TASKS_PAGE_SIZE,
+    DJANGO_API_URL,
+)
+from src.bot.task_cache import TaskCache
 
 router = Router()
 
@@ -25,48 +36,105 @@ class TaskDialogSG(StatesGroup):
     viewing_tasks = State()
 
 
+# One pooled HTTP session per bot process, closed in main()
+api_session = APISession(
+    timeout=API_TIMEOUT,
+    connect_timeout=API_CONNECT_TIMEOUT,
+    limit_per_host=API_POOL_LIMIT_PER_HOST,
+    retries=API_RETRIES,
+)
+
+
+# Recently viewed task pages, keyed by Telegram user ID and cursor
+task_cache = TaskCache(ttl=BOT_TASK_CACHE_TTL, maxsize=BOT_TASK_CACHE_SIZE)
+
+
 # API Client to communicate with Django
 class APIClient:
-    def __init__(self):
+    def __init__(self, session=api_session, cache=task_cache):
         self.base_url = DJANGO_API_URL
+        self.session = session
+        self.cache = cache
+
+    async def get_user_tasks(self, telegram_user_id: int, cursor: str | None = None):
+        """
+        One page of the user's tasks: {"results": [...], "next": cursor,
+        "previous": cursor, "has_previous": bool}. A previous cursor of None
+        with has_previous set means the first page.
+        """
+        try:
+            # Failed fetches raise and are therefore never cached
+            return await self.cache.get(
+                telegram_user_id,
+                lambda: self._fetch_user_tasks(telegram_user_id, cursor),
+                cursor=cursor,
+            )
+        except Exception as e:
+            print(f"Error fetching tasks: {e}")
+            return {
+                "results": [],
+                "next": None,
+                "previous": None,
+                "has_previous": False,
+            }
 
-    async def get_user_tasks(self, telegram_user_id: int):
-        async with aiohttp.ClientSession() as session:
-            try:
-                # Use the new endpoint that accepts telegram ID
-                url = f"{self.base_url}/telegram/user/{telegram_user_id}/tasks/"
-                async with session.get(url) as resp:
-                    if resp.status == 200:
-                        return await resp.json()
-                    else:
-                        return []
-            except Exception as e:
-                print(f"Error fetching tasks: {e}")
-                return []
+    async def _fetch_user_tasks(self, telegram_user_id: int, cursor: str | None):
+        # Use the new endpoint that accepts telegram ID
+        url = f"{self.base_url}/telegram/user/{telegram_user_id}/tasks/"
+        # Only what format_tasks() shows, plus the id the task cache matches tasks by
+        params = {"page_size": BOT_TASKS_PAGE_SIZE, "fields": "id,title,created_at"}
+        if cursor:
+            params["cursor"] = cursor
+        status, data = await self.session.get(url, params=params)
+        if status != 200:
+            raise APIError(status, data)
+        return {
+            "results": data.get("results", []),
+            "next": _cursor(data.get("next")),
+            "previous": _cursor(data.get("previous")),
+            "has_previous": bool(data.get("previous")),
+        }
 
     async def create_task(self, title: str, description: str, telegram_user_id: int):
-        async with aiohttp.ClientSession() as session:
-            # In a real implementation, we'd need to authenticate the user
-            # For this demo, we'll use a default user (ID=1), but in real app you'd have auth
-            url = f"{self.base_url}/tasks/"
-            payload = {
-                "title": title,
-                "description": description,
-                "user": 1,  # In real app, this would be authenticated user's ID
-            }
-            try:
-                async with session.post(url, json=payload) as resp:
-                    print(f"API Response Status: {resp.status}")
-                    response_text = await resp.text()
-                    print(f"API Response Text: {response_text}")
-                    if resp.status in [200, 201]:
-                        return await resp.json()
-                    else:
-                        print(f"Error creating task: {resp.status}")
-                        return None
-            except Exception as e:
-                print(f"Error creating task: {e}")
+        # In a real implementation, we'd need to authenticate the user
+        # For this demo, we'll use a default user (ID=1), but in real app you'd have auth
+        url = f"{self.base_url}/tasks/"
+        payload = {
+            "title": title,
+            "description": description,
+            "user": 1,  # In real app, this would be authenticated user's ID
+        }
+        try:
+            status, data = await self.session.post(url, json=payload)
+            print(f"API Response Status: {status}")
+            print(f"API Response Text: {data}")
+            if status in [200, 201]:
+                self.cache.add_task(telegram_user_id, data)
+                return data
+            else:
+                print(f"Error creating task: {status}")
                 return None
+        except Exception as e:
+            print(f"Error creating task: {e}")
+            return None
+
+
+def _cursor(link):
+    """Cursor token of a next/previous link of the paginated API"""
+    if not link:
+        return None
+    return parse_qs(urlsplit(link).query).get("cursor", [None])[0]
+
+
+def format_tasks(tasks):
+    """Task list text, built in one join instead of repeated concatenation"""
+    if not tasks:
+        return "No tasks found."
+    return "\n".join(
+        f"• {task.get('title', 'No title')} "
+        f"(Created: {task.get('created_at', 'Unknown date')})"
+        for task in tasks
+    )
 
 
 # Data getters
@@ -75,16 +143,21 @@ async def main_menu_getter(dialog_manager: DialogManager, **kwargs):
 
 
 async def tasks_getter(dialog_manager: DialogManager, **kwargs):
-    # This would be called when viewing tasks
-    tasks = dialog_manager.dialog_data.get("tasks", [])
-    tasks_str = ""
-    if tasks:
-        for task in tasks:
-            tasks_str += f"• {task.get('title', 'No title')} (Created: {task.get('created_at', 'Unknown date')})\n"
-    else:
-        tasks_str = "No tasks found."
-
-    return {"tasks_str": tasks_str}
+    # Only the page on screen is fetched (usually from the task cache)
+    page = await APIClient().get_user_tasks(
+        dialog_manager.event.from_user.id,
+        cursor=dialog_manager.dialog_data.get("tasks_cursor"),
+    )
+    number = dialog_manager.dialog_data.get("tasks_page", 1)
+    tasks_str = format_tasks(page["results"])
+    if number > 1 or page["next"]:
+        tasks_str = f"Page {number}\n\n{tasks_str}"
+
+    return {
+        "tasks_str": tasks_str,
+        "has_prev": page["has_previous"],
+        "has_next": bool(page["next"]),
+    }
 
 
 # Handler for description getter
@@ -112,14 +185,39 @@ async def show_add_title(
 async def show_view_tasks(
     callback: CallbackQuery, button: Button, manager: DialogManager
 ):
-    # Fetch actual tasks from Django API
-    client = APIClient()
-    tasks = await client.get_user_tasks(callback.from_user.id)
-
-    manager.dialog_data["tasks"] = tasks
+    # Start at the first page; tasks_getter fetches it from the Django API
+    manager.dialog_data["tasks_cursor"] = None
+    manager.dialog_data["tasks_page"] = 1
     await manager.switch_to(TaskDialogSG.viewing_tasks)
 
 
+async def show_next_tasks(
+    callback: CallbackQuery, button: Button, manager: DialogManager
+):
+    await _turn_tasks_page(callback, manager, "next", 1)
+
+
+async def show_prev_tasks(
+    callback: CallbackQuery, button: Button, manager: DialogManager
+):
+    await _turn_tasks_page(callback, manager, "previous", -1)
+
+
+async def _turn_tasks_page(callback, manager, direction, step):
+    # The page on screen is cached, so this costs no API call
+    page = await APIClient().get_user_tasks(
+        callback.from_user.id, cursor=manager.dialog_data.get("tasks_cursor")
+    )
+    if direction == "next" and not page["next"]:
+        return
+    if direction == "previous" and not page["has_previous"]:
+        return
+    manager.dialog_data["tasks_cursor"] = page[direction]
+    manager.dialog_data["tasks_page"] = max(
+        1, manager.dialog_data.get("tasks_page", 1) + step
+    )
+
+
 # Input handlers
 async def process_title(
     message: Message,
@@ -219,6 +317,20 @@ task_dialog = Dialog(
     ),
     Window(
         Format("{tasks_str}"),
+        Row(
+            Button(
+                Const("« Prev"),
+                id="tasks_prev",
+                on_click=show_prev_tasks,
+                when="has_prev",
+            ),
+            Button(
+                Const("Next »"),
+                id="tasks_next",
+                on_click=show_next_tasks,
+                when="has_next",
+            ),
+        ),
         Button(Const("Back"), id="back_to_main", on_click=show_main_menu),
         state=TaskDialogSG.viewing_tasks,
         getter=tasks_getter,
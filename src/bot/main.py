@@ -2,15 +2,36 @@ import asyncio
 import logging
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import DefaultKeyBuilder, RedisStorage
 from aiogram.types import Message
 from aiogram_dialog import DialogManager, StartMode, setup_dialogs
+from aiogram.webhook.aiohttp_server import setup_application
 from aiogram_dialog.api.exceptions import UnknownIntent
+from aiohttp import web
 
-from src.bot.config import BOT_TOKEN
-from src.bot.dialogs import TaskDialogSG, task_dialog
+from src.bot.config import (
+    BOT_MAX_CONCURRENT_UPDATES,
+    BOT_MAX_PENDING_UPDATES,
+    BOT_MODE,
+    BOT_TOKEN,
+    FSM_DATA_TTL,
+    FSM_REDIS_URL,
+    FSM_STATE_TTL,
+    TELEGRAM_API_URL,
+    WEBHOOK_BASE_URL,
+    WEBHOOK_HOST,
+    WEBHOOK_PATH,
+    WEBHOOK_PORT,
+    WEBHOOK_SECRET,
+)
+from src.bot.dialogs import TaskDialogSG, api_session, task_dialog
+from src.bot.webhook import OrderedRequestHandler
 
 # Enable logging
 logging.basicConfig(level=logging.INFO)
@@ -33,10 +54,30 @@ async def start_command(message: Message, dialog_manager: DialogManager):
         await dialog_manager.start(TaskDialogSG.main_menu, mode=StartMode.RESET_STACK)
 
 
-async def main():
-    """Main function to run the bot"""
-    bot = Bot(token=BOT_TOKEN)
-    dp = Dispatcher()
+def create_bot():
+    """Bot talking to Telegram, or to TELEGRAM_API_URL (e.g. a fake server)"""
+    session = None
+    if TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(TELEGRAM_API_URL))
+    return Bot(token=BOT_TOKEN, session=session)
+
+
+def create_storage():
+    """Shared Redis storage for FSM and dialog state, if configured"""
+    if not FSM_REDIS_URL:
+        return MemoryStorage()
+    return RedisStorage.from_url(
+        FSM_REDIS_URL,
+        # aiogram-dialog keeps its stacks and contexts under separate destinies
+        key_builder=DefaultKeyBuilder(with_destiny=True),
+        state_ttl=FSM_STATE_TTL,
+        data_ttl=FSM_DATA_TTL,
+    )
+
+
+def create_dispatcher():
+    # The storage is closed by the dispatcher's shutdown
+    dp = Dispatcher(storage=create_storage())
 
     # Register commands first
     dp.message.register(start_command, CommandStart())
@@ -46,11 +87,65 @@ async def main():
 
     # Setup dialogs
     setup_dialogs(dp)
+    return dp
+
+
+def create_webhook_app(bot, dp):
+    """aiohttp app that receives updates on WEBHOOK_PATH"""
+    app = web.Application()
+    OrderedRequestHandler(
+        dp,
+        bot,
+        secret_token=WEBHOOK_SECRET,
+        max_concurrency=BOT_MAX_CONCURRENT_UPDATES,
+        max_pending=BOT_MAX_PENDING_UPDATES,
+    ).register(app, path=WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+
+    async def set_webhook(app):
+        if WEBHOOK_BASE_URL:
+            await bot.set_webhook(
+                f"{WEBHOOK_BASE_URL.rstrip('/')}{WEBHOOK_PATH}",
+                secret_token=WEBHOOK_SECRET,
+                allowed_updates=dp.resolve_used_update_types(),
+            )
+
+    app.on_startup.append(set_webhook)
+    return app
+
+
+async def run_webhook(bot, dp):
+    runner = web.AppRunner(create_webhook_app(bot, dp))
+    await runner.setup()
+    await web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start()
+    logging.info(
+        "Webhook listening on %s:%s%s", WEBHOOK_HOST, WEBHOOK_PORT, WEBHOOK_PATH
+    )
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def run_polling(bot, dp):
+    # getUpdates is refused while a webhook is set
+    await bot.delete_webhook()
+    await dp.start_polling(bot)
+
+
+async def main():
+    """Main function to run the bot"""
+    bot = create_bot()
+    dp = create_dispatcher()
 
     # Run the bot
     try:
-        await dp.start_polling(bot)
+        if BOT_MODE == "webhook":
+            await run_webhook(bot, dp)
+        else:
+            await run_polling(bot, dp)
     finally:
+        await api_session.close()
         await bot.session.close()
 
 
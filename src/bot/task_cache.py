@@ -0,0 +1,119 @@
+"""
+In-process cache of task list pages, keyed by Telegram user ID and cursor.
+
+Entries expire after a TTL and the least recently used ones are evicted once
+the cache is full. Concurrent misses for the same page share one in-flight
+API call, so a burst of taps turns into a single request.
+
+A page is a dict with the tasks under ``"results"``; whatever else the API
+client puts next to them (e.g. neighbouring cursors) is kept as is.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+
+
+class _Entry:
+    __slots__ = ("page", "expires_at", "stale")
+
+    def __init__(self, page, expires_at):
+        self.page = page
+        self.expires_at = expires_at
+        self.stale = False
+
+
+class TaskCache:
+    """
+    TTL + LRU cache with request coalescing.
+
+    ``add_task`` writes a newly created task through to the user's first page
+    (lists are newest first, and keyset cursors of later pages stay valid)
+    and marks it stale: the next read returns the page right away, new task
+    included, and refreshes it from the API in the background.
+    """
+
+    def __init__(self, ttl=30.0, maxsize=1024, clock=time.monotonic):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._written = {}
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "refreshes": 0}
+
+    async def get(self, user_id, fetch, cursor=None):
+        """Cached page of ``user_id`` at ``cursor``; ``fetch()`` loads it"""
+        key = (user_id, cursor)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > self.clock():
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            if entry.stale and key not in self._inflight:
+                self.stats["refreshes"] += 1
+                self._start_fetch(key, fetch)
+            return entry.page
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+        else:
+            self.stats["misses"] += 1
+            future = self._start_fetch(key, fetch)
+        # A cancelled waiter must not cancel the fetch shared with others
+        return await asyncio.shield(future)
+
+    def set(self, user_id, page, cursor=None):
+        key = (user_id, cursor)
+        self._entries[key] = _Entry(page, self.clock() + self.ttl)
+        self._entries.move_to_end(key)
+        # The entry just set is never evicted, even with a tiny maxsize
+        while len(self._entries) > max(self.maxsize, 1):
+            self._entries.popitem(last=False)
+
+    def add_task(self, user_id, task):
+        """Write a created task through to the first page of its user"""
+        key = (user_id, None)
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.page = {**entry.page, "results": [task, *entry.page["results"]]}
+            entry.stale = True
+        if key in self._inflight:
+            # The running fetch may have missed it; see _fetch
+            self._written.setdefault(key, []).append(task)
+
+    def invalidate(self, user_id):
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+
+    def _start_fetch(self, key, fetch):
+        future = asyncio.ensure_future(self._fetch(key, fetch))
+        # Background refreshes have no waiter to see their errors
+        future.add_done_callback(_consume_exception)
+        self._inflight[key] = future
+        return future
+
+    async def _fetch(self, key, fetch):
+        user_id, cursor = key
+        try:
+            page = await fetch()
+            known = {task.get("id") for task in page["results"]}
+            missed = [
+                task
+                for task in reversed(self._written.get(key, ()))
+                if task.get("id") not in known
+            ]
+            if missed:
+                page = {**page, "results": [*missed, *page["results"]]}
+            self.set(user_id, page, cursor=cursor)
+            if missed:
+                self._entries[key].stale = True
+            return page
+        finally:
+            self._inflight.pop(key, None)
+            self._written.pop(key, None)
+
+
+def _consume_exception(future):
+    if not future.cancelled():
+        future.exception()
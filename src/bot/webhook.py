@@ -0,0 +1,108 @@
+"""
+Webhook mode of the bot.
+
+Telegram POSTs updates to an aiohttp app instead of the bot long-polling for
+them, so several bot replicas can run behind a load balancer. Each update is
+acknowledged right away and handled in the background:
+
+* at most ``max_concurrency`` handlers run at a time;
+* updates of the same chat are handled one after another, in arrival order;
+* at most ``max_pending`` updates wait in memory. Beyond that the webhook
+  delays its answer, which makes Telegram slow down (backpressure).
+
+Ordering is per replica: with several replicas, updates of one chat are only
+ordered if the load balancer routes them to the same one.
+"""
+
+import asyncio
+import logging
+from functools import partial
+
+from aiogram.methods import TelegramMethod
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Events that carry the chat directly, or inside their message
+_CHAT_PATHS = (("chat",), ("message", "chat"))
+
+
+def chat_key(update):
+    """Key that serializes updates of one chat (or user) from a raw update"""
+    for name, event in update.items():
+        if name == "update_id" or not isinstance(event, dict):
+            continue
+        for path in _CHAT_PATHS:
+            value = event
+            for part in path:
+                value = value.get(part) if isinstance(value, dict) else None
+            if value and "id" in value:
+                return ("chat", value["id"])
+        user = event.get("from") or event.get("user")
+        if user and "id" in user:
+            return ("user", user["id"])
+    # Nothing to order by, e.g. polls: handle independently
+    return ("update", update.get("update_id"))
+
+
+class OrderedRequestHandler(SimpleRequestHandler):
+    """Webhook handler with bounded concurrency and per-chat ordering"""
+
+    def __init__(
+        self, dispatcher, bot, *, max_concurrency=32, max_pending=1000, **kwargs
+    ):
+        super().__init__(dispatcher, bot, handle_in_background=True, **kwargs)
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        self._tails = {}
+        self._tasks = set()
+
+    async def handle(self, request):
+        bot = await self.resolve_bot(request)
+        token = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not self.verify_secret(token, bot):
+            return web.Response(body="Unauthorized", status=401)
+
+        update = await request.json(loads=bot.session.json_loads)
+        await self._pending.acquire()
+        self.submit(bot, update)
+        return web.json_response({}, dumps=bot.session.json_dumps)
+
+    __call__ = handle
+
+    def submit(self, bot, update):
+        """Schedule a raw update behind the previous update of its chat"""
+        key = chat_key(update)
+        task = asyncio.create_task(self._process(bot, update, self._tails.get(key)))
+        self._tails[key] = task
+        self._tasks.add(task)
+        task.add_done_callback(partial(self._finished, key))
+        return task
+
+    async def _process(self, bot, update, previous):
+        try:
+            if previous is not None:
+                # Errors of the previous update are its own business
+                await asyncio.wait([previous])
+            async with self._running:
+                result = await self.dispatcher.feed_raw_update(
+                    bot=bot, update=update, **self.data
+                )
+                if isinstance(result, TelegramMethod):
+                    await self.dispatcher.silent_call_request(bot=bot, result=result)
+        except Exception:
+            logger.exception("Failed to handle update %s", update.get("update_id"))
+        finally:
+            self._pending.release()
+
+    def _finished(self, key, task):
+        self._tasks.discard(task)
+        if self._tails.get(key) is task:
+            del self._tails[key]
+
+    async def close(self):
+        """Let accepted updates finish, then close the bot session"""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks))
+        await super().close()
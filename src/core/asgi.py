@@ -0,0 +1,19 @@
+import os
+import sys
+from pathlib import Path
+
+from django.core.asgi import get_asgi_application
+
+# Add the src directory to the Python path
+# This allows imports relative to 'src' directory (e.g., 'core', 'api')
+src_dir = Path(__file__).resolve().parent.parent
+sys.path.append(str(src_dir))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+# Route the hot reads to the async views (see API_ASYNC_VIEWS)
+os.environ.setdefault("API_ASYNC_VIEWS", "1")
+# Persistent connections are not closed reliably by async requests; borrow
+# them from the psycopg pool instead (see DB_POOL)
+os.environ.setdefault("DB_POOL", "1")
+
+application = get_asgi_application()
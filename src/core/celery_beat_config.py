@@ -8,6 +8,11 @@ celery_app.conf.beat_schedule = {
         "task": "api.tasks.check_due_tasks",
         "schedule": crontab(minute="*"),  # Run every minute
     },
+    # Fix drift of the incrementally maintained task counters
+    "reconcile-task-stats": {
+        "task": "api.tasks.reconcile_task_stats",
+        "schedule": crontab(minute=30, hour=3),
+    },
 }
 
 celery_app.conf.timezone = "UTC"
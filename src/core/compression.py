@@ -0,0 +1,192 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+JSON, NDJSON and CSV responses of at least API_COMPRESSION_MIN_SIZE bytes,
+and streaming ones of any size, are compressed with the first encoding of
+API_COMPRESSION_ENCODINGS (zstd, br, gzip by default) that the client
+accepts with the highest quality. zstd needs the zstandard package and br
+the brotli package; encodings whose package is missing are not offered.
+
+HTML is left alone: the browsable API and the admin put CSRF tokens next to
+reflected input, which is what BREACH recovers from compressed responses.
+"""
+
+import zlib
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import sync_and_async_middleware
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv")
+
+
+class GzipCompressor:
+    level = 6
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    # Higher qualities cost far more CPU for a few percent
+    quality = 4
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=self.quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    level = 3
+
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+COMPRESSORS = {"gzip": GzipCompressor}
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+
+
+def compress(encoding, data):
+    compressor = COMPRESSORS[encoding]()
+    return compressor.compress(data) + compressor.finish()
+
+
+def choose_encoding(accept_encoding, encodings):
+    """
+    Encoding of ``encodings`` (in order of preference) to use for a request
+    with this Accept-Encoding header, or None
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_response(request, response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type not in COMPRESSIBLE_TYPES or response.has_header(
+        "Content-Encoding"
+    ):
+        return response
+    if not response.streaming and len(response.content) < (
+        settings.API_COMPRESSION_MIN_SIZE
+    ):
+        return response
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+    encoding = choose_encoding(
+        request.headers.get("Accept-Encoding", ""),
+        [name for name in settings.API_COMPRESSION_ENCODINGS if name in COMPRESSORS],
+    )
+    if encoding is None:
+        return response
+
+    if response.streaming:
+        compressor = COMPRESSORS[encoding]()
+        if response.is_async:
+            response.streaming_content = _acompress_stream(
+                compressor, response.streaming_content
+            )
+        else:
+            response.streaming_content = _compress_stream(
+                compressor, response.streaming_content
+            )
+        del response["Content-Length"]
+    else:
+        compressed = compress(encoding, response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+
+    # The body differs from the uncompressed one, so a strong ETag must not
+    # match it
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response["ETag"] = "W/" + etag
+    response["Content-Encoding"] = encoding
+    return response
+
+
+def _compress_stream(compressor, chunks):
+    for chunk in chunks:
+        # Flushed per chunk, so a slow stream still reaches the client early
+        yield compressor.compress(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+async def _acompress_stream(compressor, chunks):
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+@sync_and_async_middleware
+def compression_middleware(get_response):
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            return compress_response(request, await get_response(request))
+
+    else:
+
+        def middleware(request):
+            return compress_response(request, get_response(request))
+
+    return middleware
@@ -0,0 +1,101 @@
+"""
+Read replica routing.
+
+Writes always go to the primary (``default``). Reads go to the ``replica``
+alias only inside ``use_replica()``, and only when a replica is configured
+(DATABASE_REPLICA_ENABLED); everything else keeps reading the primary.
+
+``replica_routing_middleware`` opens that block around safe requests, so GET
+list and detail views read from the replica. A client that has just written
+something gets a cookie that pins its reads to the primary for
+DATABASE_REPLICA_PIN_SECONDS, long enough for the replica to catch up
+(read-your-writes).
+"""
+
+import contextlib
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.decorators import sync_and_async_middleware
+
+REPLICA_DB_ALIAS = "replica"
+PIN_COOKIE = "db_pin"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_read_db = ContextVar("read_db", default=None)
+
+
+def replica_db():
+    """Alias replica reads go to: the replica, or the primary if there is none"""
+    if settings.DATABASE_REPLICA_ENABLED:
+        return REPLICA_DB_ALIAS
+    return DEFAULT_DB_ALIAS
+
+
+def current_read_db():
+    """Alias the reads of the current request or task are routed to"""
+    return _read_db.get() or DEFAULT_DB_ALIAS
+
+
+@contextlib.contextmanager
+def use_replica(enabled=True):
+    """Route the reads of the block to the replica (or explicitly not)"""
+    token = _read_db.set(replica_db() if enabled else DEFAULT_DB_ALIAS)
+    try:
+        yield
+    finally:
+        _read_db.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_db.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema from the primary
+        return db != REPLICA_DB_ALIAS
+
+
+def _reads_from_replica(request):
+    return request.method in SAFE_METHODS and PIN_COOKIE not in request.COOKIES
+
+
+def _pin_after_write(request, response):
+    if request.method not in SAFE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            PIN_COOKIE,
+            "1",
+            max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_routing_middleware(get_response):
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            with use_replica(_reads_from_replica(request)):
+                response = await get_response(request)
+            return _pin_after_write(request, response)
+
+    else:
+
+        def middleware(request):
+            with use_replica(_reads_from_replica(request)):
+                response = get_response(request)
+            return _pin_after_write(request, response)
+
+    return middleware
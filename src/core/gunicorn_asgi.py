@@ -0,0 +1,25 @@
+"""
+Gunicorn config for the ASGI deployment: uvicorn workers serving core.asgi.
+
+    gunicorn -c src/core/gunicorn_asgi.py src.core.asgi:application
+
+Every worker runs an event loop, so it serves many concurrent requests
+instead of one at a time like the default sync workers; a few workers per
+CPU are enough. Settings can be overridden with the usual GUNICORN_CMD_ARGS
+or the variables below.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Backlog of connections waiting to be accepted under load spikes
+backlog = int(os.environ.get("GUNICORN_BACKLOG", "2048"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# Recycle workers now and then to cap slow memory growth
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "1000"))
@@ -1,38 +1,221 @@
 """
 Custom ID Generator for Django models
 Avoids UUID, random module, standard Postgres functions, and integer increments
+
+IDs are Snowflake-style 63-bit integers rendered as a prefix plus 16
+uppercase hex digits, e.g. ``TASK_0001A2B3C4D5E6F7``:
+
+    | 41 bits: ms since ID_EPOCH_MS | 10 bits: worker id | 12 bits: sequence |
+
+Within one worker the values are strictly increasing, and because the
+timestamp is the most significant part, IDs sort roughly by creation time
+(k-sortable), both as integers and as fixed-width strings.
 """
 
-import hashlib
+import os
+import socket
+import threading
 import time
 
 from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
 
+# 2025-01-01T00:00:00Z; 41 bits of milliseconds last until 2094
+ID_EPOCH_MS = 1735689600000
 
-def generate_custom_id(prefix=""):
+WORKER_ID_BITS = 10
+SEQUENCE_BITS = 12
+
+MAX_WORKER_ID = (1 << WORKER_ID_BITS) - 1
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+ID_HEX_WIDTH = 16
+
+WORKER_LEASE_KEY = "id-generator:worker:{}"
+# Seconds a leased worker id stays reserved without being renewed
+WORKER_LEASE_TIMEOUT = 60
+
+# Cache backends that other processes (or hosts) do not see, or that keep
+# nothing, so leases taken from them cannot keep worker ids apart
+UNSHARED_CACHE_BACKENDS = (LocMemCache, FileBasedCache, DummyCache)
+
+# Set in processes forked after this module was imported
+_forked = False
+
+
+def pinned_worker_id():
+    """
+    Worker id pinned by ID_GENERATOR_WORKER_ID (0-1023), or None to lease one.
+
+    A pinned id is only unique if every process gets its own value, so a
+    forked process (a gunicorn or Celery prefork worker), which inherits the
+    value of its parent, refuses to use it.
+    """
+    worker_id = getattr(settings, "ID_GENERATOR_WORKER_ID", None)
+    if worker_id is None or worker_id == "":
+        return None
+    worker_id = int(worker_id)
+    if not 0 <= worker_id <= MAX_WORKER_ID:
+        raise ValueError(f"ID_GENERATOR_WORKER_ID must be in 0..{MAX_WORKER_ID}")
+    if _forked:
+        raise ImproperlyConfigured(
+            "ID_GENERATOR_WORKER_ID is shared by forked worker processes; "
+            "unset it to lease a worker id per process"
+        )
+    return worker_id
+
+
+class WorkerIdLease:
     """
-    Generate a unique identifier based on timestamp and hash
-    Format: prefix_timestamp_hash_part
+    Worker id leased from the shared cache (Redis), one key per id.
+
+    A process takes the first id whose key it can add and renews the key
+    while it generates IDs, so no two running processes hold the same id; the
+    ids of processes that died are free again after WORKER_LEASE_TIMEOUT. A
+    lease whose key is no longer ours (expired, evicted or taken over) is
+    given up for a new one. When the default cache is not shared between
+    processes, is unreachable or all ids are taken, IDs cannot be generated.
     """
-    # Get current timestamp with microseconds for uniqueness
-    timestamp = str(time.time())
 
-    # Create a hash of the timestamp combined with Django's secret key for uniqueness
-    hash_input = f"{timestamp}{settings.SECRET_KEY}".encode("utf-8")
-    hash_obj = hashlib.sha256(hash_input)
-    hash_hex = hash_obj.hexdigest()
+    def __init__(self, timeout=WORKER_LEASE_TIMEOUT):
+        self.timeout = timeout
+        self.worker_id = None
+        self._token = f"{socket.gethostname()}:{os.getpid()}:{time.time_ns()}"
+        self._renewed = 0.0
+        self._lock = threading.Lock()
+
+    def current(self):
+        """The leased worker id, renewed or re-leased once a third has passed"""
+        with self._lock:
+            if self.worker_id is None:
+                return self._acquire()
+            elapsed = time.monotonic() - self._renewed
+            if elapsed < self.timeout / 3:
+                return self.worker_id
+            key = self._key(self.worker_id)
+            # The key may have been evicted and added by another process
+            if cache.get(key) == self._token and cache.touch(key, self.timeout):
+                self._renewed = time.monotonic()
+                return self.worker_id
+            return self._acquire()
 
-    # Take a portion of the hash to create the ID
-    # Using 12 characters for reasonable length and uniqueness
-    hash_part = hash_hex[:12]
+    def _acquire(self):
+        if isinstance(caches["default"], UNSHARED_CACHE_BACKENDS):
+            raise ImproperlyConfigured(
+                "Leasing ID generator worker ids needs a cache shared by all "
+                "processes (Redis); set ID_GENERATOR_WORKER_ID to pin one instead"
+            )
+        # Probing from a PID-dependent slot keeps processes started together
+        # from contending for the same keys
+        start = os.getpid()
+        for offset in range(MAX_WORKER_ID + 1):
+            worker_id = (start + offset) & MAX_WORKER_ID
+            if cache.add(self._key(worker_id), self._token, self.timeout):
+                self.worker_id = worker_id
+                self._renewed = time.monotonic()
+                return worker_id
+        raise RuntimeError(
+            f"All {MAX_WORKER_ID + 1} ID generator worker ids are leased"
+        )
+
+    def _key(self, worker_id):
+        return WORKER_LEASE_KEY.format(worker_id)
+
+
+class SnowflakeGenerator:
+    """
+    Per-process generator of monotonic 63-bit IDs.
+
+    The generator keeps a single logical clock, ``(ms << SEQUENCE_BITS) | seq``.
+    Every reservation advances it past both the wall clock and the last value
+    handed out, so IDs never repeat even if the system clock steps backwards
+    or more than 4096 IDs are requested within one millisecond; in those cases
+    the clock simply runs slightly ahead of real time.
+    """
 
-    # Combine prefix with timestamp and hash part
-    # Use last 10 digits of timestamp to keep it reasonable
-    time_part = str(int(float(timestamp) * 1000000))[
-        -10:
-    ]  # Last 10 digits of microsecond timestamp
+    def __init__(self, worker_id=None):
+        self._worker_id = worker_id
+        self._lease = None
+        self._lock = threading.Lock()
+        self._last = -1
 
-    return f"{prefix}{time_part}{hash_part.upper()}"
+    @property
+    def worker_id(self):
+        if self._worker_id is None and self._lease is None:
+            self._worker_id = pinned_worker_id()
+            if self._worker_id is None:
+                self._lease = WorkerIdLease()
+        if self._lease is not None:
+            return self._lease.current()
+        return self._worker_id
+
+    def reserve(self, count=1):
+        """Reserve ``count`` consecutive IDs and return them as integers"""
+        if count < 1:
+            return []
+
+        worker_bits = self.worker_id << SEQUENCE_BITS
+        now = (time.time_ns() // 1_000_000 - ID_EPOCH_MS) << SEQUENCE_BITS
+        # The lock only guards the clock bump, whatever the size of the batch
+        with self._lock:
+            start = max(now, self._last + 1)
+            self._last = start + count - 1
+
+        return [
+            ((tick >> SEQUENCE_BITS) << (WORKER_ID_BITS + SEQUENCE_BITS))
+            | worker_bits
+            | (tick & SEQUENCE_MASK)
+            for tick in range(start, start + count)
+        ]
+
+    def next_id(self):
+        return self.reserve(1)[0]
+
+
+_generator = SnowflakeGenerator()
+
+
+def _reset_after_fork():
+    # A forked child must not share the worker id of its parent
+    global _forked, _generator
+    _forked = True
+    _generator = SnowflakeGenerator()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def format_id(prefix, value):
+    """Render an integer ID as ``prefix`` + fixed-width uppercase hex"""
+    return f"{prefix}{value:0{ID_HEX_WIDTH}X}"
+
+
+def parse_id(prefix, custom_id):
+    """Inverse of format_id; raises ValueError for foreign or legacy IDs"""
+    if not custom_id.startswith(prefix):
+        raise ValueError(f"{custom_id!r} does not start with {prefix!r}")
+    digits = custom_id[len(prefix) :]
+    if len(digits) != ID_HEX_WIDTH:
+        raise ValueError(f"{custom_id!r} is not a {ID_HEX_WIDTH}-digit ID")
+    return int(digits, 16)
+
+
+def generate_custom_id(prefix=""):
+    """
+    Generate a unique identifier
+    Format: prefix + 16 hex digits (timestamp, worker id, sequence)
+    """
+    return format_id(prefix, _generator.next_id())
+
+
+def generate_custom_ids(prefix, count):
+    """Reserve ``count`` IDs in one call, e.g. for bulk inserts"""
+    return [format_id(prefix, value) for value in _generator.reserve(count)]
 
 
 def generate_task_id():
@@ -40,6 +223,11 @@ def generate_task_id():
     return generate_custom_id("TASK_")
 
 
+def generate_task_ids(count):
+    """Generate ``count`` unique IDs for Task objects"""
+    return generate_custom_ids("TASK_", count)
+
+
 def generate_category_id():
     """Generate a unique ID for Category objects"""
     return generate_custom_id("CAT_")
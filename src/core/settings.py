@@ -32,10 +32,12 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "core.compression.compression_middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.db_router.replica_routing_middleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -60,6 +62,31 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "core.wsgi.application"
 
+# Database connections are reused across requests and Celery tasks: either
+# kept open for DB_CONN_MAX_AGE seconds and health-checked before reuse, or,
+# with DB_POOL=1, borrowed from a per-process psycopg pool. The pool size
+# depends on the kind of process (PROCESS_TYPE) and can be overridden.
+PROCESS_TYPE = os.environ.get("PROCESS_TYPE", "web")
+DB_POOL_SIZES = {
+    # (min, max) per process; ASGI workers run queries of several requests
+    # at once, a Celery prefork child or beat one at a time
+    "web": (2, 10),
+    "worker": (1, 2),
+    "beat": (1, 2),
+}
+DB_POOL = os.environ.get("DB_POOL", "0") == "1"
+# Behind pgbouncer in transaction mode server-side cursors cannot be used
+DB_PGBOUNCER = os.environ.get("DB_PGBOUNCER", "0") == "1"
+
+_pool_min_size, _pool_max_size = DB_POOL_SIZES.get(PROCESS_TYPE, DB_POOL_SIZES["web"])
+DB_POOL_OPTIONS = {
+    "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", _pool_min_size)),
+    "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", _pool_max_size)),
+    # Seconds a request waits for a free connection before failing
+    "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+    "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "600")),
+}
+
 # Database
 DATABASES = {
     "default": {
@@ -69,9 +96,29 @@ DATABASES = {
         "PASSWORD": os.environ.get("DB_PASSWORD", "postgres"),
         "HOST": os.environ.get("DB_HOST", "localhost"),
         "PORT": os.environ.get("DB_PORT", "5432"),
+        # A pooled connection goes back to the pool after every request
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": DB_PGBOUNCER,
+        "OPTIONS": {"pool": DB_POOL_OPTIONS} if DB_POOL else {},
     }
 }
 
+# Read replica for GET views and the due task scan (see core.db_router). The
+# alias always exists, so tests can route to it; reads only use it when
+# DB_REPLICA_HOST is set. Clients that wrote something read from the primary
+# for DB_REPLICA_PIN_SECONDS afterwards.
+DATABASE_REPLICA_ENABLED = bool(os.environ.get("DB_REPLICA_HOST"))
+DATABASE_REPLICA_PIN_SECONDS = int(os.environ.get("DB_REPLICA_PIN_SECONDS", "5"))
+DATABASES["replica"] = {
+    **DATABASES["default"],
+    "HOST": os.environ.get("DB_REPLICA_HOST", DATABASES["default"]["HOST"]),
+    "PORT": os.environ.get("DB_REPLICA_PORT", DATABASES["default"]["PORT"]),
+    "OPTIONS": dict(DATABASES["default"]["OPTIONS"]),
+    "TEST": {"MIRROR": "default"},
+}
+DATABASE_ROUTERS = ["core.db_router.ReplicaRouter"]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -98,6 +145,12 @@ USE_TZ = True
 STATIC_URL = "/static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
 
+# Custom ID generator (core.id_generator). Each process leases its worker id
+# (0-1023) from the default cache, so creating rows (and migration 0004)
+# needs Redis to be reachable. Pin one only for a single, non-forking process
+# per value, e.g. a one-off command or tests without Redis.
+ID_GENERATOR_WORKER_ID = os.environ.get("ID_GENERATOR_WORKER_ID")
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
@@ -109,9 +162,67 @@ CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
 
+# Cache (Redis, a separate database from the Celery broker)
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ.get(
+            "CACHE_URL",
+            os.environ.get("REDIS_URL", "redis://localhost:6379").rstrip("/") + "/1",
+        ),
+        "KEY_PREFIX": "tz",
+    }
+}
+
+# Lifetime of cached task list and category responses in seconds (0 disables)
+API_RESPONSE_CACHE_TIMEOUT = int(os.environ.get("API_RESPONSE_CACHE_TIMEOUT", "300"))
+
+# Default page size of the task lists (api.pagination.KeysetPagination)
+API_PAGE_SIZE = int(os.environ.get("API_PAGE_SIZE", "50"))
+
+# Seconds a process reuses the fallback user of anonymous requests
+# (api.fallback_user); bounds how long other processes miss its deletion
+API_FALLBACK_USER_TTL = int(os.environ.get("API_FALLBACK_USER_TTL", "60"))
+
+# Serve the hot task list reads with async views (api.async_views); core.asgi
+# turns this on, WSGI deployments keep the sync views
+API_ASYNC_VIEWS = os.environ.get("API_ASYNC_VIEWS", "0") == "1"
+
+# Build task list pages from .values() rows instead of TaskSerializer
+# (api.fast_serializers); the JSON is the same either way
+API_FAST_TASK_READS = os.environ.get("API_FAST_TASK_READS", "1") == "1"
+
+# Encode and parse JSON with orjson if installed (api.renderers); the output
+# is the same as with the stdlib encoder
+API_ORJSON = os.environ.get("API_ORJSON", "1") == "1"
+
+# Compress JSON, NDJSON and CSV responses of at least this many bytes with the
+# first of these encodings the client accepts (core.compression); an empty
+# list turns compression off
+API_COMPRESSION_MIN_SIZE = int(os.environ.get("API_COMPRESSION_MIN_SIZE", "1024"))
+API_COMPRESSION_ENCODINGS = [
+    name.strip()
+    for name in os.environ.get("API_COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",")
+    if name.strip()
+]
+
+# Number of due tasks carried by a single notification message
+TASK_NOTIFICATION_BATCH_SIZE = int(
+    os.environ.get("TASK_NOTIFICATION_BATCH_SIZE", "500")
+)
+
 # Rest Framework
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly"
-    ]
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
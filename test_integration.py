@@ -3,18 +3,88 @@ Integration test for the ToDo List system
 This test verifies that all components work together properly.
 """
 
+import asyncio
+import csv
+import gzip
+import importlib.util
+import json
+import io
 import os
 import sys
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
 from pathlib import Path
+from unittest import mock
 
 # Add src to path
 sys.path.append(str(Path(__file__).resolve().parent / "src"))
 
+import aiohttp
 import django
-from django.contrib.auth.models import User
-from django.test import Client, TestCase
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.fsm.storage.redis import RedisStorage
+from aiohttp.test_utils import TestClient, TestServer
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import AnonymousUser, Permission, User
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import (
+    AsyncRequestFactory,
+    Client,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.functional import lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
 
-from api.models import Category, Task
+from api import async_views
+from api import cache as response_cache
+from api.fallback_user import (
+    get_fallback_user,
+    get_fallback_user_stats,
+    invalidate_fallback_user,
+)
+from api.export import CSV_COLUMNS
+from api.models import Category, Task, UserTaskStats
+from api.pagination import KeysetPagination
+from api.renderers import ORJSONParser, ORJSONRenderer
+from api.serializers import TaskSerializer
+from api.stats import count_task_stats, get_task_stats
+from api.tasks import check_due_tasks, reconcile_task_stats, send_task_notifications
+from bot import main as bot_main
+from bot.api_session import APISession
+from bot.task_cache import TaskCache
+from bot.webhook import OrderedRequestHandler
+from core.compression import COMPRESSORS, choose_encoding
+from core.id_generator import (
+    WORKER_LEASE_KEY,
+    SnowflakeGenerator,
+    WorkerIdLease,
+    generate_task_ids,
+    parse_id,
+)
+from src.bot import dialogs
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
 django.setup()
@@ -135,6 +205,1650 @@ class IntegrationTest(TestCase):
         print(f"✓ Category 2 ID: {cat2.id}")
 
 
+class TaskPaginationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="pager", password="pass12345")
+        self.client = Client()
+        self.client.login(username="pager", password="pass12345")
+
+        # Several tasks share a created_at so the id tiebreaker is exercised
+        now = timezone.now()
+        for i in range(7):
+            task = Task.objects.create(title=f"Task {i}", user=self.user)
+            Task.objects.filter(pk=task.pk).update(
+                created_at=now - timedelta(minutes=i // 3)
+            )
+
+    def test_keyset_pages_cover_all_tasks_in_order(self):
+        """Following next/previous links walks the full ordering exactly once"""
+        expected = list(
+            Task.objects.filter(user=self.user)
+            .order_by("-created_at", "id")
+            .values_list("id", flat=True)
+        )
+
+        seen, pages = [], []
+        url = "/api/tasks/?page_size=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            body = response.json()
+            pages.append(body)
+            seen.extend(task["id"] for task in body["results"])
+            url = body["next"]
+
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0]["previous"])
+
+        previous = self.client.get(pages[-1]["previous"]).json()
+        self.assertEqual(
+            [task["id"] for task in previous["results"]],
+            [task["id"] for task in pages[1]["results"]],
+        )
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get("/api/tasks/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "SQLite query plan")
+    def test_deep_pages_seek_into_the_index(self):
+        next_url = self.client.get("/api/tasks/?page_size=3").json()["next"]
+        request = Request(APIRequestFactory().get(next_url))
+        queryset = KeysetPagination()._page_queryset(
+            Task.objects.filter(user=self.user), request, None
+        )
+        plan = queryset.explain()
+        # The range starts at the cursor instead of at the user's first task
+        self.assertIn("task_user_created_id_idx (user_id=? AND created_at<?)", plan)
+
+
+class TaskQueryCountTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="counter", password="pass12345")
+        self.categories = [
+            Category.objects.create(name=f"Category {i}") for i in range(3)
+        ]
+        self.client = Client()
+        self.client.login(username="counter", password="pass12345")
+
+    def _add_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(title=f"Task {i}", user=self.user)
+            task.categories.set(self.categories)
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_task_list_query_count_is_constant(self):
+        """Listing tasks with nested categories does not issue N+1 queries"""
+        self._add_tasks(2)
+        small = self._count_queries("/api/tasks/")
+
+        self._add_tasks(20)
+        large = self._count_queries("/api/tasks/")
+
+        self.assertEqual(small, large)
+
+    def test_user_task_list_query_count_is_constant(self):
+        self._add_tasks(2)
+        small = self._count_queries("/api/users/counter/tasks/")
+
+        self._add_tasks(20)
+        large = self._count_queries("/api/users/counter/tasks/")
+
+        self.assertEqual(small, large)
+
+
+class FallbackUserCacheTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="first", password="pass12345")
+        Task.objects.create(title="Demo task", user=self.user)
+
+    def test_anonymous_requests_reuse_cached_user(self):
+        """Only the first anonymous request looks up the fallback user"""
+        self.client.get("/api/tasks/")
+        before = get_fallback_user_stats()
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/tasks/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 1)
+        user_lookups = [
+            query
+            for query in context.captured_queries
+            if 'FROM "auth_user"' in query["sql"]
+        ]
+        self.assertEqual(user_lookups, [])
+        after = get_fallback_user_stats()
+        self.assertEqual(after["hits"], before["hits"] + 1)
+        self.assertEqual(after["misses"], before["misses"])
+
+    def test_cache_is_invalidated_on_user_delete(self):
+        self.assertEqual(get_fallback_user(), self.user)
+
+        self.user.delete()
+        self.assertIsNone(get_fallback_user())
+
+        other = User.objects.create_user(username="second", password="pass12345")
+        self.assertEqual(get_fallback_user(), other)
+
+    def test_users_created_by_other_processes_are_found(self):
+        User.objects.all().delete()
+        self.assertIsNone(get_fallback_user())
+
+        # bulk_create sends no signals, like a write in another process
+        User.objects.bulk_create([User(username="demo")])
+        response = self.client.post(
+            "/api/tasks/", {"title": "Anonymous"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Task.objects.get(title="Anonymous").user.username, "demo")
+
+    def test_cached_user_expires(self):
+        get_fallback_user()
+        before = get_fallback_user_stats()
+        with override_settings(API_FALLBACK_USER_TTL=0):
+            invalidate_fallback_user()
+            get_fallback_user()
+            get_fallback_user()
+        self.assertEqual(get_fallback_user_stats()["misses"], before["misses"] + 2)
+
+
+class DueTaskNotificationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="notify", password="pass12345")
+        past = timezone.now() - timedelta(hours=1)
+        for i in range(5):
+            Task.objects.create(title=f"Due {i}", user=self.user, due_date=past)
+        Task.objects.create(title="Done", user=self.user, due_date=past, completed=True)
+        Task.objects.create(
+            title="Later", user=self.user, due_date=timezone.now() + timedelta(days=1)
+        )
+
+    @override_settings(TASK_NOTIFICATION_BATCH_SIZE=2)
+    def test_due_tasks_are_dispatched_in_batches(self):
+        """One message per batch, each carrying the data the worker needs"""
+        with mock.patch.object(send_task_notifications, "delay") as delay:
+            result = check_due_tasks()
+
+        self.assertEqual(result, "Checked 5 due tasks in 3 batches")
+        batches = [call.args[0] for call in delay.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        titles = sorted(task["title"] for batch in batches for task in batch)
+        self.assertEqual(titles, [f"Due {i}" for i in range(5)])
+        self.assertTrue(all(task["username"] == "notify" for task in batches[0]))
+
+        with self.assertNumQueries(0):
+            send_task_notifications(batches[0])
+
+    def test_due_tasks_are_notified_once(self):
+        """A second tick only picks up tasks that became due since the first"""
+        with mock.patch.object(send_task_notifications, "delay"):
+            self.assertEqual(check_due_tasks(), "Checked 5 due tasks in 1 batches")
+            self.assertEqual(check_due_tasks(), "Checked 0 due tasks in 0 batches")
+
+            later = Task.objects.get(title="Later")
+            later.due_date = timezone.now() - timedelta(minutes=1)
+            later.save()
+            self.assertEqual(check_due_tasks(), "Checked 1 due tasks in 1 batches")
+
+    def test_new_due_date_resets_notification(self):
+        with mock.patch.object(send_task_notifications, "delay"):
+            check_due_tasks()
+
+        task = Task.objects.get(title="Due 0")
+        self.assertIsNotNone(task.notified_at)
+
+        serializer = TaskSerializer(
+            task, data={"due_date": timezone.now()}, partial=True
+        )
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        task.refresh_from_db()
+        self.assertIsNone(task.notified_at)
+
+
+class TaskBulkTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="bulk", password="pass12345")
+        self.user.user_permissions.add(
+            *Permission.objects.filter(codename__in=["change_task", "delete_task"])
+        )
+        self.work = Category.objects.create(name="Work")
+        self.home = Category.objects.create(name="Home")
+        self.client = Client()
+        self.client.login(username="bulk", password="pass12345")
+
+    def _post(self, payload):
+        return self.client.post(
+            "/api/tasks/bulk/", payload, content_type="application/json"
+        )
+
+    def test_bulk_create_update_delete(self):
+        existing = Task.objects.create(title="Old", user=self.user)
+        existing.categories.add(self.work)
+        doomed = Task.objects.create(title="Doomed", user=self.user)
+
+        response = self._post(
+            {
+                "create": [
+                    {"title": f"New {i}", "category_ids": [self.work.id, self.home.id]}
+                    for i in range(3)
+                ],
+                "update": [
+                    {
+                        "id": existing.id,
+                        "completed": True,
+                        "category_ids": [self.home.id],
+                    }
+                ],
+                "delete": [doomed.id],
+            }
+        )
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(
+            [task["title"] for task in body["created"]], ["New 0", "New 1", "New 2"]
+        )
+        self.assertEqual(len(body["created"][0]["categories"]), 2)
+        self.assertEqual(body["deleted"], [doomed.id])
+
+        existing.refresh_from_db()
+        self.assertTrue(existing.completed)
+        self.assertEqual(list(existing.categories.all()), [self.home])
+        self.assertFalse(Task.objects.filter(id=doomed.id).exists())
+        self.assertEqual(Task.objects.filter(user=self.user).count(), 4)
+
+    def test_invalid_item_rolls_back_everything(self):
+        response = self._post(
+            {
+                "create": [{"title": "Fine"}, {"description": "No title"}],
+                "delete": ["TASK_MISSING"],
+            }
+        )
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]
+        self.assertEqual(errors["create"][0]["index"], 1)
+        self.assertIn("title", errors["create"][0]["errors"])
+        self.assertEqual(errors["delete"][0]["index"], 0)
+        self.assertFalse(Task.objects.exists())
+
+    def test_malformed_update_ids_are_item_errors(self):
+        task = Task.objects.create(title="Kept", user=self.user)
+        response = self._post(
+            {
+                "update": [
+                    {"id": [task.id], "title": "List"},
+                    {"id": {"id": task.id}},
+                    {"id": True},
+                    {"title": "No id"},
+                    {"id": task.id, "title": "Fine"},
+                ]
+            }
+        )
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["errors"]["update"]
+        self.assertEqual([error["index"] for error in errors], [0, 1, 2, 3])
+        self.assertEqual(errors[0]["errors"], {"id": ["Invalid task id."]})
+        self.assertEqual(errors[3]["errors"], {"id": ["This field is required."]})
+        task.refresh_from_db()
+        self.assertEqual(task.title, "Kept")
+
+    def test_bulk_create_query_count_is_constant(self):
+        def count(size):
+            payload = {
+                "create": [
+                    {"title": f"Task {i}", "category_ids": [self.work.id]}
+                    for i in range(size)
+                ]
+            }
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(self._post(payload).status_code, 200)
+            return len(context.captured_queries)
+
+        self.assertEqual(count(2), count(50))
+
+    def test_updates_and_deletes_need_model_permissions(self):
+        task = Task.objects.create(title="Kept", user=get_fallback_user() or self.user)
+        for client in (Client(), self._client_without_permissions()):
+            for payload in (
+                {"update": [{"id": task.id, "title": "Changed"}]},
+                {"delete": [task.id]},
+            ):
+                with self.subTest(payload=payload):
+                    response = client.post(
+                        "/api/tasks/bulk/", payload, content_type="application/json"
+                    )
+                    self.assertIn(response.status_code, (401, 403))
+        task.refresh_from_db()
+        self.assertEqual(task.title, "Kept")
+
+        response = Client().post(
+            "/api/tasks/bulk/",
+            {"create": [{"title": "Anonymous"}]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def _client_without_permissions(self):
+        User.objects.create_user(username="plain", password="pass12345")
+        client = Client()
+        client.login(username="plain", password="pass12345")
+        return client
+
+
+class IDGeneratorTest(SimpleTestCase):
+    def test_ids_are_monotonic_and_unique(self):
+        """Many IDs within the same millisecond never collide"""
+        ids = [Task._meta.pk.pre_save(Task(), add=True) for _ in range(10000)]
+        ids += generate_task_ids(10000)
+
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertEqual(ids, sorted(ids))
+        self.assertTrue(all(task_id.startswith("TASK_") for task_id in ids))
+
+    def test_workers_do_not_collide(self):
+        first = SnowflakeGenerator(worker_id=1).reserve(5000)
+        second = SnowflakeGenerator(worker_id=2).reserve(5000)
+
+        self.assertFalse(set(first) & set(second))
+
+    def test_pinned_worker_id_is_refused_after_fork(self):
+        with override_settings(ID_GENERATOR_WORKER_ID="5"):
+            self.assertEqual(SnowflakeGenerator().worker_id, 5)
+            with (
+                mock.patch("core.id_generator._forked", True),
+                self.assertRaises(ImproperlyConfigured),
+            ):
+                SnowflakeGenerator().worker_id
+
+    def test_id_round_trip(self):
+        (task_id,) = generate_task_ids(1)
+        self.assertEqual(f"TASK_{parse_id('TASK_', task_id):016X}", task_id)
+        with self.assertRaises(ValueError):
+            parse_id("TASK_", "TASK_1234567890ABCDEF012345")
+
+
+class WorkerIdLeaseTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        # The test cache stands in for the Redis shared by all processes
+        patcher = mock.patch("core.id_generator.UNSHARED_CACHE_BACKENDS", ())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_processes_lease_distinct_worker_ids(self):
+        first, second = WorkerIdLease(), WorkerIdLease()
+        self.assertNotEqual(first.current(), second.current())
+        with (
+            mock.patch("core.id_generator.cache.add", return_value=False),
+            self.assertRaises(RuntimeError),
+        ):
+            WorkerIdLease().current()
+
+    def test_expired_leases_are_taken_over(self):
+        first = WorkerIdLease(timeout=0.05)
+        worker_id = first.current()
+        time.sleep(0.1)
+        # Probing starts from the same slot in this process
+        self.assertEqual(WorkerIdLease().current(), worker_id)
+        # The first holder notices and leases another id
+        self.assertNotEqual(first.current(), worker_id)
+
+    def test_leases_taken_over_after_eviction_are_given_up(self):
+        first = WorkerIdLease(timeout=0.3)
+        worker_id = first.current()
+        # Evicted and leased by another process before the first renews it
+        cache.set(WORKER_LEASE_KEY.format(worker_id), "other", 60)
+        time.sleep(0.15)
+        self.assertNotEqual(first.current(), worker_id)
+        self.assertEqual(cache.get(WORKER_LEASE_KEY.format(worker_id)), "other")
+
+    def test_unshared_caches_are_refused(self):
+        with (
+            mock.patch(
+                "core.id_generator.UNSHARED_CACHE_BACKENDS", (type(caches["default"]),)
+            ),
+            self.assertRaises(ImproperlyConfigured),
+        ):
+            WorkerIdLease().current()
+
+
+class CustomIDStorageTest(TestCase):
+    def test_ids_are_stored_as_integers(self):
+        """The prefixed ID is the API form; the column holds its bigint value"""
+        user = User.objects.create_user(username="storage", password="pass12345")
+        task = Task.objects.create(title="Stored", user=user)
+        category = Category.objects.create(name="Stored")
+        task.categories.add(category)
+
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM api_task")
+            (raw_id,) = cursor.fetchone()
+        self.assertEqual(raw_id, parse_id("TASK_", task.id))
+
+        fetched = Task.objects.prefetch_related("categories").get(id=task.id)
+        self.assertEqual(fetched.id, task.id)
+        self.assertEqual(list(fetched.categories.all()), [category])
+        self.assertFalse(Task.objects.filter(id="TASK_NOT_AN_ID").exists())
+
+
+class TaskFilterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="filters", password="pass12345")
+        self.client = Client()
+        self.client.login(username="filters", password="pass12345")
+
+        self.work = Category.objects.create(name="Work")
+        now = timezone.now()
+        self.tasks = []
+        for i in range(6):
+            task = Task.objects.create(
+                title=f"Task {i}",
+                description="Quarterly report" if i % 2 else "",
+                completed=i < 2,
+                # Two tasks without a due date exercise NULL ordering
+                due_date=now + timedelta(days=i) if i < 4 else None,
+                user=self.user,
+            )
+            if i % 3 == 0:
+                task.categories.add(self.work)
+            self.tasks.append(task)
+
+    def ids(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return {task["id"] for task in response.json()["results"]}
+
+    def test_filters(self):
+        tasks = self.tasks
+        self.assertEqual(
+            self.ids("/api/tasks/?completed=false"), {t.id for t in tasks[2:]}
+        )
+        self.assertEqual(
+            self.ids(f"/api/tasks/?category={self.work.id}"), {tasks[0].id, tasks[3].id}
+        )
+        self.assertEqual(
+            self.ids("/api/tasks/?search=report"),
+            {tasks[1].id, tasks[3].id, tasks[5].id},
+        )
+        due_after = (tasks[2].due_date - timedelta(minutes=1)).isoformat()
+        self.assertEqual(
+            self.ids(
+                "/api/tasks/?completed=0&due_after=" + due_after.replace("+", "%2B")
+            ),
+            {tasks[2].id, tasks[3].id},
+        )
+
+    def test_ordering_pages_through_null_values(self):
+        """Keyset pages follow ?ordering= in both directions, NULLs included"""
+        for ordering in ("due_date", "-due_date", "title", "-title"):
+            with self.subTest(ordering=ordering):
+                seen, pages = [], []
+                url = f"/api/tasks/?ordering={ordering}&page_size=2"
+                while url:
+                    body = self.client.get(url).json()
+                    pages.append(body)
+                    seen.extend(task["id"] for task in body["results"])
+                    url = body["next"]
+
+                key = ordering.lstrip("-")
+                # NULL sorts as the largest value, ties keep ascending ids
+                expected = sorted(
+                    sorted(self.tasks, key=lambda t: t.id),
+                    key=lambda t: (getattr(t, key) is None, getattr(t, key) or 0),
+                    reverse=ordering.startswith("-"),
+                )
+                self.assertEqual(seen, [t.id for t in expected])
+
+                previous = self.client.get(pages[-1]["previous"]).json()
+                self.assertEqual(previous["results"], pages[-2]["results"])
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in (
+            "ordering=description",
+            "completed=maybe",
+            "due_before=tomorrow",
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(f"/api/tasks/?{query}")
+                self.assertEqual(response.status_code, 400)
+
+
+@override_settings(API_RESPONSE_CACHE_TIMEOUT=0)
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(
+            username="etag", password="pass12345", email="etag@example.com"
+        )
+        self.client = Client()
+        self.client.login(username="etag", password="pass12345")
+        self.category = Category.objects.create(name="Home")
+        self.task = Task.objects.create(title="Poll me", user=self.user)
+        self.task.categories.add(self.category)
+        Task.objects.create(title="Another", user=self.user)
+
+    def assertNotModified(self, url, etag, queries=1):
+        with self.assertNumQueries(queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_unchanged_list_costs_no_query(self):
+        for url in ("/api/tasks/", "/api/telegram/user/1/tasks/"):
+            with self.subTest(url=url):
+                etag = self.client.get(url)["ETag"]
+                # Only the session and user lookups of the logged in client;
+                # the ETag comes from the cache's version counters
+                self.assertNotModified(url, etag, queries=2)
+
+    def test_without_the_cache_only_conditional_lists_are_scanned(self):
+        url = "/api/tasks/"
+        with mock.patch("api.cache.get_versions", return_value=None):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertNotIn("ETag", response)
+            sql = [query["sql"] for query in context.captured_queries]
+            self.assertFalse(any("MAX(" in query for query in sql))
+
+            etag = self.client.get(url, HTTP_IF_NONE_MATCH='"other"')["ETag"]
+            # Plus the aggregate
+            self.assertNotModified(url, etag, queries=3)
+
+    def test_changes_invalidate_the_etag(self):
+        url = "/api/tasks/"
+        changes = [
+            lambda: Task.objects.create(title="New", user=self.user),
+            lambda: self.client.patch(
+                f"/api/tasks/{self.task.id}/",
+                {"completed": True},
+                content_type="application/json",
+            ),
+            lambda: self.client.patch(
+                f"/api/categories/{self.category.id}/",
+                {"name": "House"},
+                content_type="application/json",
+            ),
+            lambda: self.category.delete(),
+            lambda: Task.objects.filter(title="Another").delete(),
+        ]
+        etag = self.client.get(url)["ETag"]
+        for change in changes:
+            change()
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+            etag = response["ETag"]
+
+    def test_etag_depends_on_query_string(self):
+        etag = self.client.get("/api/tasks/")["ETag"]
+        response = self.client.get(
+            "/api/tasks/?completed=true", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_supports_etag_and_last_modified(self):
+        url = f"/api/tasks/{self.task.id}/"
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Last-Modified", response)
+        self.assertNotModified(url, response["ETag"], queries=3)
+
+        response = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(self.client.get("/api/tasks/MISSING/").status_code, 404)
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="cached", password="pass12345")
+        self.category = Category.objects.create(name="Errands")
+        self.task = Task.objects.create(
+            title="Buy milk",
+            due_date=timezone.now() - timedelta(minutes=1),
+            user=self.user,
+        )
+        self.task.categories.add(self.category)
+
+    def get(self, url="/api/tasks/"):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_warm_reads_skip_the_database(self):
+        for url in (
+            "/api/tasks/",
+            "/api/telegram/user/1/tasks/",
+            "/api/categories/",
+            f"/api/categories/{self.category.id}/",
+        ):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                before = response_cache.get_response_cache_stats()
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                    not_modified = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=first["ETag"]
+                    )
+                self.assertEqual(second.json(), first.json())
+                self.assertEqual(second["ETag"], first["ETag"])
+                self.assertEqual(not_modified.status_code, 304)
+                after = response_cache.get_response_cache_stats()
+                self.assertEqual(after["hits"], before["hits"] + 2)
+                self.assertGreater(after["hit_rate"], 0)
+
+    def test_writes_invalidate_cached_lists(self):
+        def titles():
+            return [task["title"] for task in self.get()["results"]]
+
+        def category_names():
+            return [
+                c["name"] for task in self.get()["results"] for c in task["categories"]
+            ]
+
+        self.assertEqual(titles(), ["Buy milk"])
+
+        Task.objects.create(title="Call mom", user=self.user)
+        self.assertEqual(titles(), ["Call mom", "Buy milk"])
+
+        self.category.name = "Shopping"
+        self.category.save()
+        self.assertEqual(category_names(), ["Shopping"])
+
+        self.task.categories.clear()
+        self.assertEqual(category_names(), [])
+
+        self.user.user_permissions.add(Permission.objects.get(codename="delete_task"))
+        self.client.force_login(self.user)
+        self.client.post(
+            "/api/tasks/bulk/",
+            {"delete": [self.task.id]},
+            content_type="application/json",
+        )
+        self.assertEqual(titles(), ["Call mom"])
+
+    def test_due_task_check_invalidates_notified_at(self):
+        self.assertIsNone(self.get()["results"][0]["notified_at"])
+        with mock.patch("api.tasks.send_task_notifications.delay"):
+            check_due_tasks()
+        self.assertIsNotNone(self.get()["results"][0]["notified_at"])
+
+    def test_concurrent_miss_waits_for_the_renderer(self):
+        key = "api:response:test"
+        cache.add(f"{key}:lock", 1)
+        timer = threading.Timer(0.1, cache.set, (key, {"data": "rendered"}))
+        timer.start()
+        fill = mock.Mock()
+
+        entry, response = response_cache._get_or_fill(key, fill)
+
+        timer.join()
+        fill.assert_not_called()
+        self.assertEqual(entry, {"data": "rendered"})
+        self.assertIsNone(response)
+
+
+class APISessionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.calls = []
+        self.peers = set()
+
+        async def flaky(request):
+            self.calls.append(request.method)
+            self.peers.add(request.transport.get_extra_info("peername"))
+            if len(self.calls) == 1:
+                return web.Response(status=503)
+            return web.json_response({"results": []})
+
+        app = web.Application()
+        app.router.add_route("*", "/tasks/", flaky)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.api = APISession(backoff=0.01)
+
+    async def asyncTearDown(self):
+        await self.api.close()
+        await self.server.close()
+
+    async def test_get_is_retried_on_one_pooled_connection(self):
+        url = str(self.server.make_url("/tasks/"))
+        self.assertEqual(await self.api.get(url), (200, {"results": []}))
+        self.assertEqual(await self.api.get(url), (200, {"results": []}))
+        self.assertEqual(self.calls, ["GET", "GET", "GET"])
+        self.assertEqual(len(self.peers), 1)
+
+    async def test_post_is_not_resent_after_a_response(self):
+        url = str(self.server.make_url("/tasks/"))
+        status, _ = await self.api.post(url, json={"title": "Once"})
+        self.assertEqual(status, 503)
+        self.assertEqual(self.calls, ["POST"])
+
+    async def test_connection_errors_are_retried_then_raised(self):
+        self.api.retries = 1
+        with self.assertRaises(aiohttp.ClientConnectorError):
+            await self.api.post("http://127.0.0.1:1/tasks/", json={})
+
+
+class BotTaskCacheTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TaskCache(ttl=10, maxsize=2, clock=lambda: self.now)
+        self.fetches = 0
+
+    async def fetch(self):
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        return {"results": [{"id": f"TASK_{self.fetches}"}], "next": "c2"}
+
+    async def test_concurrent_misses_share_one_fetch(self):
+        pages = await asyncio.gather(*(self.cache.get(1, self.fetch) for _ in range(5)))
+        self.assertEqual(self.fetches, 1)
+        self.assertEqual([page["results"] for page in pages], [[{"id": "TASK_1"}]] * 5)
+        self.assertEqual(self.cache.stats["coalesced"], 4)
+
+    async def test_ttl_and_lru_eviction(self):
+        await self.cache.get(1, self.fetch)
+        await self.cache.get(1, self.fetch)
+        self.assertEqual(self.fetches, 1)
+
+        self.now = 11
+        await self.cache.get(1, self.fetch)
+        self.assertEqual(self.fetches, 2)
+
+        # User 1 was used most recently, so user 2 is evicted for user 3
+        await self.cache.get(2, self.fetch)
+        await self.cache.get(1, self.fetch)
+        await self.cache.get(3, self.fetch)
+        await self.cache.get(1, self.fetch)
+        self.assertEqual(self.fetches, 4)
+        await self.cache.get(2, self.fetch)
+        self.assertEqual(self.fetches, 5)
+
+    async def test_pages_are_cached_per_cursor(self):
+        await self.cache.get(1, self.fetch)
+        await self.cache.get(1, self.fetch, cursor="c2")
+        await self.cache.get(1, self.fetch, cursor="c2")
+        self.assertEqual(self.fetches, 2)
+
+    async def test_created_task_is_written_through(self):
+        await self.cache.get(1, self.fetch)
+        await self.cache.get(1, self.fetch, cursor="c2")
+        self.cache.add_task(1, {"id": "TASK_NEW"})
+
+        # Served from the cache right away, refreshed in the background
+        page = await self.cache.get(1, self.fetch)
+        self.assertEqual(page["results"], [{"id": "TASK_NEW"}, {"id": "TASK_1"}])
+        self.assertEqual(page["next"], "c2")
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.fetches, 3)
+        page = await self.cache.get(1, self.fetch)
+        self.assertEqual(page["results"], [{"id": "TASK_3"}])
+
+        # Later pages are keyset pages and stay valid
+        page = await self.cache.get(1, self.fetch, cursor="c2")
+        self.assertEqual(page["results"], [{"id": "TASK_2"}])
+
+
+class BotTaskPagesTest(unittest.IsolatedAsyncioTestCase):
+    """The dialog's APIClient against a fake paginated API"""
+
+    async def asyncSetUp(self):
+        self.requests = []
+
+        async def tasks(request):
+            self.requests.append(dict(request.query))
+            base = str(request.url.with_query(None))
+            return web.json_response(
+                {
+                    "next": f"{base}?cursor=NEXT&page_size=10",
+                    "previous": base if "cursor" in request.query else None,
+                    "results": [{"title": "Task", "created_at": "today"}],
+                }
+            )
+
+        app = web.Application()
+        app.router.add_get("/api/telegram/user/{id}/tasks/", tasks)
+        self.server = TestServer(app)
+        await self.server.start_server()
+        self.api = APISession()
+        self.client = dialogs.APIClient(session=self.api, cache=TaskCache())
+        self.client.base_url = str(self.server.make_url("/api"))
+
+    async def asyncTearDown(self):
+        await self.api.close()
+        await self.server.close()
+
+    async def test_pages_are_fetched_by_cursor(self):
+        first = await self.client.get_user_tasks(7)
+        self.assertEqual(first["next"], "NEXT")
+        self.assertFalse(first["has_previous"])
+
+        second = await self.client.get_user_tasks(7, cursor=first["next"])
+        self.assertTrue(second["has_previous"])
+        self.assertIsNone(second["previous"])
+        fields = "id,title,created_at"
+        self.assertEqual(
+            self.requests,
+            [
+                {"page_size": "10", "fields": fields},
+                {"page_size": "10", "fields": fields, "cursor": "NEXT"},
+            ],
+        )
+
+    def test_tasks_are_rendered_in_one_join(self):
+        tasks = [{"title": f"Task {i}", "created_at": "today"} for i in range(3)]
+        self.assertEqual(
+            dialogs.format_tasks(tasks).splitlines(),
+            [f"• Task {i} (Created: today)" for i in range(3)],
+        )
+        self.assertEqual(dialogs.format_tasks([]), "No tasks found.")
+
+
+class BotWebhookTest(unittest.IsolatedAsyncioTestCase):
+    """Webhook mode against a fake Telegram Bot API server"""
+
+    async def asyncSetUp(self):
+        self.sent = []
+
+        async def bot_api(request):
+            data = await request.post()
+            self.sent.append((int(data["chat_id"]), data["text"]))
+            chat = {"id": int(data["chat_id"]), "type": "private"}
+            message = {"message_id": 1, "date": 0, "chat": chat, "text": data["text"]}
+            return web.json_response({"ok": True, "result": message})
+
+        telegram = web.Application()
+        telegram.router.add_post("/bot{token}/{method}", bot_api)
+        self.telegram = TestServer(telegram)
+        await self.telegram.start_server()
+
+        api = TelegramAPIServer.from_base(str(self.telegram.make_url("")))
+        self.bot = Bot("42:TEST", session=AiohttpSession(api=api))
+
+        self.running = self.max_running = 0
+        dp = Dispatcher()
+
+        @dp.message()
+        async def echo(message):
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+            # Later updates of a chat finish faster, unless they are ordered
+            await asyncio.sleep(0.05 / int(message.text))
+            self.running -= 1
+            await message.answer(message.text)
+
+        app = web.Application()
+        self.handler = OrderedRequestHandler(
+            dp, self.bot, secret_token="s3cret", max_concurrency=2
+        )
+        self.handler.register(app, path="/webhook")
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.telegram.close()
+
+    def update(self, update_id, chat_id, text):
+        chat = {"id": chat_id, "type": "private"}
+        user = {"id": chat_id, "is_bot": False, "first_name": "Test"}
+        message = {"message_id": update_id, "date": 0, "chat": chat}
+        message.update({"from": user, "text": text})
+        return {"update_id": update_id, "message": message}
+
+    async def test_updates_are_ordered_per_chat_and_bounded(self):
+        update_id = 0
+        for chat_id in (1, 2, 3):
+            for text in ("1", "2", "3"):
+                update_id += 1
+                response = await self.client.post(
+                    "/webhook",
+                    json=self.update(update_id, chat_id, text),
+                    headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"},
+                )
+                self.assertEqual(response.status, 200)
+
+        await self.handler.close()
+        for chat_id in (1, 2, 3):
+            texts = [text for chat, text in self.sent if chat == chat_id]
+            self.assertEqual(texts, ["1", "2", "3"])
+        self.assertEqual(self.max_running, 2)
+
+    async def test_wrong_secret_is_rejected(self):
+        response = await self.client.post("/webhook", json=self.update(1, 1, "1"))
+        self.assertEqual(response.status, 401)
+        self.assertEqual(self.sent, [])
+
+
+class BotStorageTest(unittest.IsolatedAsyncioTestCase):
+    async def test_redis_storage_when_configured(self):
+        with (
+            mock.patch.object(bot_main, "FSM_REDIS_URL", "redis://redis:6379/2"),
+            mock.patch.object(bot_main, "FSM_STATE_TTL", 60),
+            mock.patch.object(bot_main, "FSM_DATA_TTL", 120),
+        ):
+            storage = bot_main.create_storage()
+        self.addAsyncCleanup(storage.close)
+
+        self.assertIsInstance(storage, RedisStorage)
+        self.assertEqual((storage.state_ttl, storage.data_ttl), (60, 120))
+        self.assertEqual(storage.redis.connection_pool.connection_kwargs["db"], 2)
+        # Dialog stacks and contexts do not overwrite the FSM state
+        key = StorageKey(bot_id=42, chat_id=1, user_id=1, destiny="aiogd_stack")
+        self.assertTrue(storage.key_builder.with_destiny)
+        self.assertEqual(
+            storage.key_builder.build(key, "data"), "fsm:1:1:aiogd_stack:data"
+        )
+
+    async def test_memory_storage_without_redis(self):
+        with mock.patch.object(bot_main, "FSM_REDIS_URL", ""):
+            self.assertIsInstance(bot_main.create_storage(), MemoryStorage)
+
+
+class AsyncTaskViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="async", password="pass12345")
+        category = Category.objects.create(name="Async")
+        for i in range(3):
+            task = Task.objects.create(title=f"Task {i}", user=self.user)
+            task.categories.add(category)
+
+    def async_get(self, path, **headers):
+        request = AsyncRequestFactory().get(path, headers=headers)
+        request.user = AnonymousUser()
+
+        async def auser():
+            return AnonymousUser()
+
+        # Set by AuthenticationMiddleware outside of tests
+        request.auser = auser
+        if "/telegram/" in path:
+            view = async_views.telegram_user_tasks
+            return async_to_sync(view)(request, telegram_id=1)
+        return async_to_sync(async_views.task_list)(request)
+
+    def test_responses_match_the_sync_views(self):
+        paths = [
+            "/api/tasks/",
+            "/api/tasks/?page_size=2&ordering=title",
+            "/api/telegram/user/1/tasks/",
+            "/api/telegram/user/1/tasks/?fields=id,title,created_at",
+            "/api/tasks/?ordering=password",
+            "/api/tasks/?cursor=bogus",
+        ]
+        for timeout in (0, 300):
+            for path in paths:
+                with (
+                    self.subTest(path=path, timeout=timeout),
+                    override_settings(API_RESPONSE_CACHE_TIMEOUT=timeout),
+                ):
+                    cache.clear()
+                    # Async first, so the sync view also reads its cache entry
+                    response = self.async_get(path)
+                    expected = self.client.get(path)
+                    self.assertEqual(response.status_code, expected.status_code)
+                    self.assertEqual(response.content, expected.content)
+                    self.assertEqual(response.get("ETag"), expected.get("ETag"))
+                    self.assertEqual(response["Content-Type"], "application/json")
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.async_get("/api/tasks/")["ETag"]
+        response = self.async_get("/api/tasks/", if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Task.objects.create(title="New", user=self.user)
+        response = self.async_get("/api/tasks/", if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.content)["results"]
+        self.assertEqual(results[0]["title"], "New")
+
+    def test_writes_are_handled_by_the_sync_view(self):
+        request = AsyncRequestFactory().post(
+            "/api/tasks/", {"title": "Created"}, content_type="application/json"
+        )
+        request.user = AnonymousUser()
+        response = async_to_sync(async_views.task_list)(request)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.filter(title="Created").exists())
+
+
+class DatabaseSettingsTest(SimpleTestCase):
+    def load_settings(self, **env):
+        spec = importlib.util.find_spec("core.settings")
+        module = importlib.util.module_from_spec(spec)
+        env = {"DB_POOL": "0", "PROCESS_TYPE": "web", **env}
+        with mock.patch.dict(os.environ, env):
+            spec.loader.exec_module(module)
+        return module.DATABASES["default"]
+
+    def test_connections_persist_with_health_checks(self):
+        database = self.load_settings()
+        self.assertEqual(database["CONN_MAX_AGE"], 60)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertNotIn("pool", database["OPTIONS"])
+
+    def test_pool_is_sized_per_process_type(self):
+        web = self.load_settings(DB_POOL="1")
+        self.assertEqual(web["CONN_MAX_AGE"], 0)
+        self.assertEqual(web["OPTIONS"]["pool"]["max_size"], 10)
+
+        worker = self.load_settings(DB_POOL="1", PROCESS_TYPE="worker")
+        self.assertEqual(worker["OPTIONS"]["pool"]["max_size"], 2)
+
+        sized = self.load_settings(
+            DB_POOL="1", PROCESS_TYPE="beat", DB_POOL_MAX_SIZE="3"
+        )
+        self.assertEqual(sized["OPTIONS"]["pool"]["min_size"], 1)
+        self.assertEqual(sized["OPTIONS"]["pool"]["max_size"], 3)
+
+    def test_pgbouncer_mode_disables_server_side_cursors(self):
+        self.assertFalse(self.load_settings()["DISABLE_SERVER_SIDE_CURSORS"])
+        database = self.load_settings(DB_PGBOUNCER="1")
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"])
+
+
+@override_settings(DATABASE_REPLICA_ENABLED=True, API_RESPONSE_CACHE_TIMEOUT=0)
+class ReplicaRoutingTest(TransactionTestCase):
+    # The replica is a test mirror of the primary, so it sees committed rows
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="replica", password="pass")
+        self.task = Task.objects.create(
+            title="Replicated",
+            user=self.user,
+            due_date=timezone.now() - timedelta(minutes=1),
+        )
+
+    def task_queries(self, do):
+        """Queries on the task table per alias while running ``do()``"""
+        with (
+            CaptureQueriesContext(connection) as primary,
+            CaptureQueriesContext(connections["replica"]) as replica,
+        ):
+            do()
+        return {
+            alias: sum("api_task" in query["sql"] for query in context)
+            for alias, context in (("default", primary), ("replica", replica))
+        }
+
+    def test_get_views_read_from_the_replica(self):
+        for url in ("/api/tasks/", f"/api/tasks/{self.task.id}/"):
+            with self.subTest(url=url):
+                queries = self.task_queries(lambda: self.client.get(url))
+                self.assertEqual(queries["default"], 0)
+                self.assertGreater(queries["replica"], 0)
+
+    def test_writes_pin_reads_to_the_primary(self):
+        response = self.client.post(
+            "/api/tasks/", {"title": "Fresh"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn("db_pin", response.cookies)
+
+        queries = self.task_queries(lambda: self.client.get("/api/tasks/"))
+        self.assertEqual(queries["replica"], 0)
+        self.assertGreater(queries["default"], 0)
+
+    def test_due_task_scan_reads_from_the_replica(self):
+        with mock.patch.object(send_task_notifications, "delay") as delay:
+            queries = self.task_queries(check_due_tasks)
+        self.assertEqual(delay.call_count, 1)
+        # Only the re-check of the batch and the notified_at stamp hit the
+        # primary
+        self.assertEqual(queries["default"], 2)
+        self.assertEqual(queries["replica"], 1)
+
+    def test_without_a_replica_reads_stay_on_the_primary(self):
+        with override_settings(DATABASE_REPLICA_ENABLED=False):
+            queries = self.task_queries(lambda: self.client.get("/api/tasks/"))
+        self.assertEqual(queries["replica"], 0)
+
+
+class UserTaskStatsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_superuser(
+            username="stats", password="pass12345", email="stats@example.com"
+        )
+        self.client.login(username="stats", password="pass12345")
+        past = timezone.now() - timedelta(hours=1)
+        Task.objects.create(title="Due", user=self.user, due_date=past)
+        Task.objects.create(title="Done", user=self.user, completed=True)
+        Task.objects.create(title="Open", user=self.user)
+
+    def get_stats(self):
+        response = self.client.get("/api/users/stats/stats/")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def assertCountersMatch(self):
+        stats = UserTaskStats.objects.get(user=self.user)
+        counts = count_task_stats(self.user.pk)
+        self.assertEqual({field: getattr(stats, field) for field in counts}, counts)
+
+    def test_stats_endpoint(self):
+        stats = self.get_stats()
+        self.assertEqual(stats["username"], "stats")
+        self.assertEqual(
+            [stats[key] for key in ("open", "completed", "overdue", "total")],
+            [2, 1, 0, 3],
+        )
+
+        # The session and user lookups and the stats row
+        with self.assertNumQueries(3):
+            self.get_stats()
+        self.assertEqual(self.client.get("/api/users/nobody/stats/").status_code, 404)
+
+    def test_other_users_stats_are_not_found(self):
+        User.objects.create_user(username="other", password="pass12345")
+        self.assertEqual(self.client.get("/api/users/other/stats/").status_code, 404)
+        self.client.logout()
+        # Anonymous reads see the fallback user, the first one
+        self.assertEqual(self.client.get("/api/users/other/stats/").status_code, 404)
+        self.assertEqual(self.client.get("/api/users/stats/stats/").status_code, 200)
+
+    def test_tasks_completed_before_the_stamp_are_not_counted_overdue(self):
+        self.get_stats()
+
+        def complete_during_dispatch(batch):
+            task = Task.objects.get(title="Due")
+            task.completed = True
+            task.save()
+
+        with mock.patch.object(
+            send_task_notifications, "delay", side_effect=complete_during_dispatch
+        ):
+            self.assertEqual(check_due_tasks(), "Checked 0 due tasks in 1 batches")
+        self.assertIsNone(Task.objects.get(title="Due").notified_at)
+        self.assertCountersMatch()
+
+    def test_counters_follow_task_writes(self):
+        self.get_stats()
+        task = Task.objects.get(title="Open")
+        writes = [
+            lambda: self.client.post(
+                "/api/tasks/", {"title": "New"}, content_type="application/json"
+            ),
+            lambda: self.client.patch(
+                f"/api/tasks/{task.id}/",
+                {"completed": True},
+                content_type="application/json",
+            ),
+            check_due_tasks,
+            lambda: self.client.post(
+                "/api/tasks/bulk/",
+                {
+                    "create": [
+                        {"title": "Bulk"},
+                        {"title": "Bulk done", "completed": True},
+                    ],
+                    "update": [{"id": task.id, "completed": False}],
+                },
+                content_type="application/json",
+            ),
+            lambda: self.client.delete(f"/api/tasks/{task.id}/"),
+            lambda: Task.objects.filter(title__startswith="Bulk").delete(),
+        ]
+        with mock.patch.object(send_task_notifications, "delay"):
+            for write in writes:
+                write()
+                self.assertCountersMatch()
+        self.assertEqual(self.get_stats()["overdue"], 1)
+
+    def test_reconcile_fixes_drift(self):
+        self.get_stats()
+        # Queryset updates bypass the incremental counters
+        Task.objects.filter(title="Open").update(completed=True)
+        other = User.objects.create_user(username="other", password="pass12345")
+        # A user without a counters row yet
+        Task.objects.create(title="Other", user=other)
+
+        self.assertEqual(reconcile_task_stats(), "Reconciled task stats, fixed 2 users")
+        self.assertCountersMatch()
+        self.assertEqual(UserTaskStats.objects.get(user=other).open_count, 1)
+        self.assertEqual(reconcile_task_stats(), "Reconciled task stats, fixed 0 users")
+
+
+class TaskExportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="export", password="pass12345")
+        self.client.login(username="export", password="pass12345")
+        self.category = Category.objects.create(name="Export")
+        for i in range(7):
+            task = Task.objects.create(title=f"Task {i}", user=self.user)
+            if i % 2:
+                task.categories.add(self.category)
+        Task.objects.create(title="Done", user=self.user, completed=True)
+
+    def export(self, url="/api/tasks/export/", **extra):
+        response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_ndjson_matches_the_serializer(self):
+        response, body = self.export()
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in body.splitlines()]
+        tasks = Task.objects.for_user(self.user).with_related()
+        self.assertEqual(rows, TaskSerializer(tasks, many=True).data)
+
+    def test_csv(self):
+        for extra in ({"HTTP_ACCEPT": "text/csv"}, {}):
+            url = "/api/tasks/export/" + ("" if extra else "?format=csv")
+            with self.subTest(extra=extra):
+                response, body = self.export(url, **extra)
+                self.assertTrue(response["Content-Type"].startswith("text/csv"))
+                rows = list(csv.DictReader(body.splitlines()))
+                self.assertEqual(list(rows[0]), CSV_COLUMNS)
+                self.assertEqual(len(rows), 8)
+                linked = {row["title"]: row["category_ids"] for row in rows}
+                self.assertEqual(linked["Task 1"], self.category.id)
+                self.assertEqual(linked["Task 2"], "")
+
+    def test_filters_apply(self):
+        _, body = self.export("/api/tasks/export/?completed=true")
+        self.assertEqual(
+            [json.loads(line)["title"] for line in body.splitlines()], ["Done"]
+        )
+
+    def test_categories_are_prefetched_per_chunk(self):
+        with mock.patch("api.views.TaskExportView.chunk_size", 3):
+            with CaptureQueriesContext(connection) as context:
+                _, body = self.export()
+        self.assertEqual(len(body.splitlines()), 8)
+        # Session and user lookups, one query streaming the tasks and one
+        # categories query for each of the 3 chunks
+        self.assertEqual(len(context.captured_queries), 2 + 1 + 3)
+
+    async def test_asgi_streams_an_async_iterator(self):
+        _, expected = await sync_to_async(self.export)()
+        await self.async_client.aforce_login(self.user)
+        with mock.patch("api.views.TaskExportView.chunk_size", 3):
+            response = await self.async_client.get("/api/tasks/export/")
+        self.assertEqual(response.status_code, 200)
+        # Served without Django reading the whole export into a list first
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b"".join(chunks).decode(), expected)
+
+
+class TaskImportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="import", password="pass12345")
+        self.client.login(username="import", password="pass12345")
+        self.category = Category.objects.create(name="Imported")
+
+    def import_body(self, body, content_type="application/x-ndjson"):
+        return self.client.post("/api/tasks/import/", body, content_type=content_type)
+
+    def test_export_round_trip(self):
+        due = timezone.now() + timedelta(days=1)
+        task = Task.objects.create(title="Linked", user=self.user, due_date=due)
+        task.categories.add(self.category)
+        Task.objects.create(title="Done", user=self.user, completed=True)
+        get_task_stats(self.user)
+
+        for format in ("ndjson", "csv"):
+            with self.subTest(format=format):
+                response = self.client.get(f"/api/tasks/export/?format={format}")
+                body = b"".join(response.streaming_content)
+                Task.objects.filter(user=self.user).delete()
+
+                response = self.import_body(body, response["Content-Type"])
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.json()["imported"], 2)
+
+                linked = Task.objects.get(title="Linked")
+                self.assertNotEqual(linked.id, task.id)
+                self.assertEqual(linked.due_date, due)
+                self.assertEqual(list(linked.categories.all()), [self.category])
+                self.assertTrue(Task.objects.get(title="Done").completed)
+                stats = get_task_stats(self.user)
+                self.assertEqual((stats.open_count, stats.completed_count), (1, 1))
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        body = "\n".join(
+            [
+                json.dumps({"title": "Good", "category_ids": [self.category.id]}),
+                "{not json",
+                json.dumps({"description": "No title"}),
+                json.dumps(["not", "an", "object"]),
+                "",
+                json.dumps({"title": "Unknown category", "category_ids": ["CAT_X"]}),
+            ]
+        )
+        response = self.import_body(body)
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual((result["imported"], result["failed"]), (2, 3))
+        self.assertEqual([error["line"] for error in result["errors"]], [2, 3, 4])
+        self.assertIn("title", result["errors"][1]["errors"])
+        self.assertFalse(Task.objects.get(title="Unknown category").categories.exists())
+
+        response = self.import_body("{not json")
+        self.assertEqual(response.status_code, 400)
+
+    def test_malformed_input_is_reported_by_line(self):
+        lines = [
+            json.dumps({"title": "Bad categories", "categories": [1, None]}),
+            b"\xff\xfe not utf-8",
+            json.dumps({"title": "After"}),
+        ]
+        body = b"\n".join(
+            line if isinstance(line, bytes) else line.encode() for line in lines
+        )
+        result = self.import_body(body).json()
+        self.assertEqual((result["imported"], result["failed"]), (2, 1))
+        self.assertEqual(result["errors"][0]["line"], 2)
+        self.assertFalse(Task.objects.get(title="Bad categories").categories.exists())
+
+        # Beyond the csv module's field size limit
+        too_long = b"x" * (csv.field_size_limit() + 1)
+        body = b"title,description\nOne,\xff\nTwo," + too_long + b"\nThree,"
+        result = self.import_body(body, "text/csv").json()
+        self.assertEqual((result["imported"], result["failed"]), (1, 2))
+        self.assertEqual([error["line"] for error in result["errors"]], [2, 3])
+        self.assertTrue(Task.objects.filter(title="Three").exists())
+
+    def test_management_command_imports_csv_in_batches(self):
+        rows = ["title,completed,due_date,category_ids"]
+        rows += [f"Task {i},{i % 2 == 0},,{self.category.id}" for i in range(5)]
+        rows.append(",False,,")
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("\n".join(rows))
+            file.flush()
+            stdout, stderr = io.StringIO(), io.StringIO()
+            call_command(
+                "import_tasks",
+                file.name,
+                user="import",
+                batch_size=2,
+                stdout=stdout,
+                stderr=stderr,
+            )
+
+        self.assertIn("Imported 5 tasks", stdout.getvalue())
+        self.assertIn("1 rows failed", stdout.getvalue())
+        self.assertIn("line 7", stderr.getvalue())
+        tasks = Task.objects.filter(user=self.user)
+        self.assertEqual(tasks.filter(completed=True).count(), 3)
+        self.assertEqual(self.category.tasks.count(), 5)
+
+
+@override_settings(API_RESPONSE_CACHE_TIMEOUT=0)
+class FastTaskReadsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="fast", password="pass12345")
+        self.client.login(username="fast", password="pass12345")
+        categories = [
+            Category.objects.create(name=name, description=description)
+            for name, description in (("Home", None), ("Work", "Ünïcode \u2028"))
+        ]
+        now = timezone.now()
+        for i in range(7):
+            task = Task.objects.create(
+                title=f"Task {i}",
+                description="Line\nbreak" if i % 2 else None,
+                completed=i % 3 == 0,
+                due_date=now + timedelta(days=i) if i % 2 else None,
+                user=self.user,
+            )
+            task.categories.set(categories[: i % 3])
+        Task.objects.filter(title="Task 1").update(notified_at=now)
+
+    def get_pages(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.content)
+            url = response.json()["next"]
+        return pages
+
+    def test_pages_match_task_serializer(self):
+        paths = [
+            "/api/tasks/?page_size=3",
+            "/api/tasks/?page_size=2&ordering=due_date",
+            "/api/tasks/?search=break",
+            "/api/users/fast/tasks/?page_size=4",
+            "/api/telegram/user/1/tasks/?page_size=3",
+        ]
+        for path in paths:
+            with self.subTest(path=path):
+                with override_settings(API_FAST_TASK_READS=False):
+                    expected = self.get_pages(path)
+                self.assertEqual(self.get_pages(path), expected)
+
+
+@override_settings(API_RESPONSE_CACHE_TIMEOUT=0)
+class SparseFieldsetTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="sparse", password="pass12345")
+        self.client.login(username="sparse", password="pass12345")
+        self.category = Category.objects.create(name="Sparse", description="Long")
+        now = timezone.now()
+        for i in range(5):
+            task = Task.objects.create(
+                title=f"Task {i}",
+                description="Long " * 100,
+                due_date=now + timedelta(days=i % 3),
+                user=self.user,
+            )
+            task.categories.add(self.category)
+
+    def test_only_requested_fields_are_rendered(self):
+        cases = [
+            ("/api/tasks/?fields=title,created_at", ["id", "title", "created_at"]),
+            (
+                "/api/tasks/?exclude=description,categories,user",
+                [
+                    "id",
+                    "title",
+                    "completed",
+                    "due_date",
+                    "notified_at",
+                    "created_at",
+                    "updated_at",
+                ],
+            ),
+            ("/api/users/sparse/tasks/?fields=categories", ["id", "categories"]),
+            ("/api/telegram/user/1/tasks/?fields=title,id", ["id", "title"]),
+        ]
+        for path, keys in cases:
+            for fast in (True, False):
+                with (
+                    self.subTest(path=path, fast=fast),
+                    override_settings(API_FAST_TASK_READS=fast),
+                ):
+                    response = self.client.get(path)
+                    self.assertEqual(response.status_code, 200)
+                    for task in response.json()["results"]:
+                        self.assertEqual(list(task), keys)
+
+        task = Task.objects.first()
+        response = self.client.get(f"/api/tasks/{task.id}/?exclude=description")
+        self.assertNotIn("description", response.json())
+        self.assertEqual(response.json()["title"], task.title)
+        response = self.client.get("/api/categories/?fields=name")
+        self.assertEqual(response.json(), [{"id": self.category.id, "name": "Sparse"}])
+
+    def test_unused_columns_and_categories_are_not_loaded(self):
+        for fast in (True, False):
+            with (
+                self.subTest(fast=fast),
+                override_settings(API_FAST_TASK_READS=fast),
+                CaptureQueriesContext(connection) as context,
+            ):
+                response = self.client.get("/api/tasks/?fields=title,created_at")
+                self.assertEqual(response.status_code, 200)
+            sql = [query["sql"] for query in context.captured_queries]
+            self.assertFalse(any('"api_task"."description"' in query for query in sql))
+            # Only the ETag aggregate touches the categories
+            self.assertFalse(any('"api_category"."name"' in query for query in sql))
+
+    def test_pagination_without_the_ordering_field(self):
+        expected = [
+            task["id"]
+            for task in self.client.get("/api/tasks/?ordering=due_date").json()[
+                "results"
+            ]
+        ]
+        seen, url = [], "/api/tasks/?ordering=due_date&page_size=2&fields=title"
+        while url:
+            body = self.client.get(url).json()
+            seen.extend(task["id"] for task in body["results"])
+            url = body["next"]
+        self.assertEqual(seen, expected)
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get("/api/tasks/?fields=title,password&exclude=secret")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"fields", "exclude"})
+        self.assertIn("password", response.json()["fields"][0])
+
+    def test_writes_ignore_the_fieldset(self):
+        response = self.client.post(
+            "/api/tasks/?fields=id",
+            {"title": "Written", "category_ids": [self.category.id]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["title"], "Written")
+        self.assertEqual(len(response.json()["categories"]), 1)
+
+
+class JSONRendererTest(SimpleTestCase):
+    def test_output_matches_the_stdlib_renderer(self):
+        data = {
+            "text": 'Ünïcode \u2028 \u2029 "quoted" \n',
+            "lazy": lazy(lambda: "lazy", str)(),
+            "utc": datetime(2026, 1, 2, 3, 4, 5, 6, tzinfo=dt_timezone.utc),
+            "offset": timezone.localtime(timezone.now()),
+            "naive": datetime(2026, 1, 2),
+            "date": date(2026, 1, 2),
+            "decimal": Decimal("1.5"),
+            "uuid": uuid.UUID(int=1),
+            "bytes": b"raw",
+            "nested": [{"ok": True, "none": None}, (1, 2)],
+        }
+        # Left to the stdlib encoder
+        fallbacks = [{"big": 2**70}, {1: None}, None]
+        for value in [data, *fallbacks]:
+            for media_type in (None, "application/json; indent=4"):
+                for enabled in (True, False):
+                    with (
+                        self.subTest(value=value, media_type=media_type),
+                        override_settings(API_ORJSON=enabled),
+                    ):
+                        self.assertEqual(
+                            ORJSONRenderer().render(value, media_type),
+                            JSONRenderer().render(value, media_type),
+                        )
+
+    def test_non_finite_floats_render_as_null(self):
+        data = {"values": [float("nan"), float("inf"), -float("inf")]}
+        self.assertEqual(ORJSONRenderer().render(data), b'{"values":[null,null,null]}')
+
+    def test_parse_results_and_errors_match_the_stdlib_parser(self):
+        def parse(parser, body):
+            try:
+                return parser.parse(io.BytesIO(body))
+            except ParseError as exc:
+                return str(exc.detail)
+
+        for body in (
+            '{"title": "Ünïcode", "ids": [1, 2.5, null]}'.encode(),
+            b'{"big": 123456789012345678901234567890}',
+            b'{"title": ',
+            b'{"value": NaN}',
+        ):
+            with self.subTest(body=body):
+                self.assertEqual(parse(ORJSONParser(), body), parse(JSONParser(), body))
+
+
+@override_settings(API_RESPONSE_CACHE_TIMEOUT=0, API_COMPRESSION_MIN_SIZE=200)
+class ResponseCompressionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="zip", password="pass12345")
+        self.client.login(username="zip", password="pass12345")
+        for i in range(10):
+            Task.objects.create(
+                title=f"Task {i}", description="Text " * 20, user=self.user
+            )
+
+    def test_encoding_is_negotiated(self):
+        encodings = ["zstd", "br", "gzip"]
+        cases = [
+            ("gzip, deflate", "gzip"),
+            ("gzip;q=0.5, br", "br"),
+            ("br, zstd, gzip", "zstd"),
+            ("*", "zstd"),
+            ("*;q=0.1, zstd;q=0", "br"),
+            ("gzip;q=0, identity", None),
+            ("", None),
+        ]
+        for header, expected in cases:
+            with self.subTest(header=header):
+                self.assertEqual(choose_encoding(header, encodings), expected)
+
+    def test_responses_are_compressed_when_accepted(self):
+        plain = self.client.get("/api/tasks/")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        response = self.client.get("/api/tasks/", headers={"accept-encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(response["ETag"], plain["ETag"])
+
+        for encoding in set(COMPRESSORS) - {"gzip"}:
+            with self.subTest(encoding=encoding):
+                response = self.client.get(
+                    "/api/tasks/", headers={"accept-encoding": encoding}
+                )
+                self.assertEqual(response["Content-Encoding"], encoding)
+
+    def test_streams_are_compressed(self):
+        response = self.client.get(
+            "/api/tasks/export/", headers={"accept-encoding": "gzip"}
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        body = gzip.decompress(b"".join(response.streaming_content))
+        self.assertEqual(len(body.splitlines()), 10)
+
+    def test_small_and_html_responses_are_not_compressed(self):
+        with override_settings(API_COMPRESSION_MIN_SIZE=100_000):
+            response = self.client.get(
+                "/api/tasks/", headers={"accept-encoding": "gzip"}
+            )
+            self.assertFalse(response.has_header("Content-Encoding"))
+
+        response = self.client.get(
+            "/api/tasks/",
+            headers={"accept-encoding": "gzip", "accept": "text/html"},
+        )
+        self.assertTrue(response["Content-Type"].startswith("text/html"))
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
 def run_integration_tests():
     """Run all integration tests"""
     print("Running integration tests for ToDo List system...\n")